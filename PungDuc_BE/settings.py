@@ -49,6 +49,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites',
+    'django.contrib.postgres',
     'rest_framework',
     # auth
     'rest_framework.authtoken',
@@ -121,6 +122,29 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/#redis
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': env("CACHE_URL"),
+        'KEY_PREFIX': 'pungduc',
+    }
+}
+
+# Cached GET responses are keyed on a per-user data version, so this only bounds memory use.
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Route the hot read endpoints to their async views; enable when serving PungDuc_BE.asgi (see README).
+ASYNC_READ_VIEWS = env.bool("ASYNC_READ_VIEWS", default=False)
+
+# Live board events (tasks.events); tests can use tasks.events.InMemoryEventLayer.
+TASK_EVENTS = {
+    'BACKEND': 'tasks.events.RedisEventLayer',
+    'OPTIONS': {'url': env("CACHE_URL")},
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -211,6 +235,17 @@ REST_FRAMEWORK = {
         'rest_framework.pagination.PageNumberPagination'
     ],
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        'tasks.renderers.ORJSONRenderer',
+        'tasks.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'tasks.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 REST_AUTH = {
@@ -262,7 +297,30 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': crontab(minute='0', hour='0', day_of_month='1'),
         # 'schedule': timedelta(seconds=10),
     },
+    'prune_tombstones': {
+        'task': 'tasks.tasks.prune_tombstones',
+        'schedule': crontab(minute='30', hour='3'),
+    },
+    'archive_done_tasks': {
+        'task': 'tasks.tasks.archive_done_tasks',
+        'schedule': crontab(minute='0', hour='4'),
+    },
+    'purge_deleted_projects': {
+        'task': 'tasks.tasks.purge_deleted_projects',
+        'schedule': crontab(minute='15'),
+    },
 }
+
+# Delta sync: deletions are remembered this long; older cursors get a full resync.
+TOMBSTONE_RETENTION_DAYS = 30
+
+# Finished tasks move off the boards into the archive after this long.
+TASK_ARCHIVE_AFTER_DAYS = env.int("TASK_ARCHIVE_AFTER_DAYS", default=90)
+TASK_ARCHIVE_BATCH_SIZE = 5000
+
+# Rows deleted per transaction when a deleted project is purged.
+PROJECT_PURGE_BATCH_SIZE = 1000
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -12,7 +12,8 @@ class Notification(models.Model):
     ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    task = models.ForeignKey(Task, on_delete=models.CASCADE)
+    # No database constraint: a partitioned tasks table cannot back one (see partition_tables).
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, db_constraint=False)
     sent = models.BooleanField(default=False)
     sent_date = models.DateTimeField(auto_now_add=True)
     type = models.CharField(max_length=10, choices=TYPE_CHOICES)
@@ -23,3 +24,6 @@ class Notification(models.Model):
     class Meta:
         db_table = 'notifications'
         ordering = ['-sent_date']
+        indexes = [
+            models.Index(fields=['task', 'type'], condition=models.Q(sent=True), name='notifications_sent_task_type'),
+        ]
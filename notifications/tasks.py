@@ -61,27 +61,31 @@ def send_deadline_notifications():
 
 @shared_task
 def send_notification_overdue_tasks():
-    tasks = Task.objects.filter(deadline__lte=now(), status=Task.DOING)
+    # Only tasks that became overdue since the last run are touched, however large the backlog.
+    with transaction.atomic():
+        task_ids = Task.mark_overdue(now())
+        notified = set(Notification.objects.filter(task_id__in=task_ids, sent=True, type='overdue')
+                       .values_list('task_id', flat=True))
+        for task_id in task_ids:
+            if task_id not in notified:
+                transaction.on_commit(lambda task_id=task_id: send_overdue_notification.delay(str(task_id)))
 
-    for task in tasks:
-        if Notification.objects.filter(task=task, sent=True, type='overdue').exists():
-            print(f"Notification already sent for task: {task.title}")
-            continue
 
-        subject = f"Công việc đã quá hạn: {task.title}"
-        html_message = render_to_string(
-            'notifications/overdue_task_notification.html',
-            {'task': task}
-        )
-        recipient_list = [task.project.user.email]
-        from_email = settings.DEFAULT_FROM_EMAIL
-        message = EmailMessage(subject, html_message, from_email, recipient_list)
-        message.content_subtype = 'html'
-        message.send()
-        task.status = 3
-        task.save()
-
-        def create_notification():
-            Notification.objects.create(task=task, sent=True, type='overdue')
-
-        transaction.on_commit(create_notification)
+@shared_task
+def send_overdue_notification(task_id):
+    task = Task.objects.select_related('project__user').filter(id=task_id, status=Task.OVERDUE).first()
+    if task is None or Notification.objects.filter(task=task, sent=True, type='overdue').exists():
+        return
+
+    subject = f"Công việc đã quá hạn: {task.title}"
+    html_message = render_to_string(
+        'notifications/overdue_task_notification.html',
+        {'task': task}
+    )
+    recipient_list = [task.project.user.email]
+    from_email = settings.DEFAULT_FROM_EMAIL
+    message = EmailMessage(subject, html_message, from_email, recipient_list)
+    message.content_subtype = 'html'
+    message.send()
+
+    Notification.objects.create(task=task, sent=True, type='overdue')
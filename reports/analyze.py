@@ -4,12 +4,12 @@ from datetime import timedelta
 from django.utils import timezone
 import numpy as np
 
-from tasks.models import Task
+from tasks.models import Task, TaskWithArchive
 
 
 def analyze_weekly_trends(user_id, start_of_period, end_of_period):
-    tasks = Task.objects.filter(
-        project__user_id=user_id,
+    tasks = TaskWithArchive.objects.filter(
+        user_id=user_id,
         finish_at__gte=start_of_period,
         finish_at__lt=end_of_period,
         status=Task.DONE
@@ -36,8 +36,8 @@ def analyze_weekly_trends(user_id, start_of_period, end_of_period):
 
 
 def analyze_monthly_trends(user_id, start_of_month, end_of_month, num_days_in_month):
-    tasks = Task.objects.filter(
-        project__user_id=user_id,
+    tasks = TaskWithArchive.objects.filter(
+        user_id=user_id,
         finish_at__gte=start_of_month,
         finish_at__lt=end_of_month,
         status=Task.DONE
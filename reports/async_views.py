@@ -0,0 +1,22 @@
+from adrf.views import APIView
+
+from reports.views import GetAllWeeklyReport, GetAllMonthlyReport
+from tasks.utils import AsyncListMixin, APIResponse
+
+
+# Async versions of the report lists, routed when ASYNC_READ_VIEWS is set.
+class AsyncReportListMixin(AsyncListMixin):
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        reports = [report async for report in queryset]
+        serializer = self.get_serializer(reports, many=True)
+        return APIResponse(serializer.data)
+
+
+class AsyncGetAllWeeklyReport(AsyncReportListMixin, APIView, GetAllWeeklyReport):
+    pass
+
+
+class AsyncGetAllMonthlyReport(AsyncReportListMixin, APIView, GetAllMonthlyReport):
+    pass
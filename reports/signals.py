@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from reports.models import Report
+from tasks.signals import bump_on_commit
+
+
+@receiver(post_save, sender=Report)
+@receiver(post_delete, sender=Report)
+def report_changed(sender, instance, **kwargs):
+    bump_on_commit(instance.user_id)
@@ -8,7 +8,7 @@ from django.utils import timezone
 from accounts.models import CustomUser
 from reports.analyze import analyze_weekly_trends, analyze_monthly_trends
 from reports.models import Report
-from tasks.models import Task
+from tasks.models import Task, TaskWithArchive
 
 
 @shared_task
@@ -21,23 +21,23 @@ def create_weekly_report():
         start_of_period = start_of_period.replace(hour=0, minute=0, second=0, microsecond=0)
         end_of_period = end_of_period.replace(hour=0, minute=0, second=0, microsecond=0)
 
-        tasks_created_in_week = Task.objects.filter(
+        tasks_created_in_week = TaskWithArchive.objects.filter(
             created_at__gte=start_of_period,
             created_at__lt=end_of_period,
-            project__user=user,
+            user=user,
         ).order_by('id')
 
-        tasks_finished_in_week = Task.objects.filter(
+        tasks_finished_in_week = TaskWithArchive.objects.filter(
             finish_at__gte=start_of_period,
             finish_at__lt=end_of_period,
-            project__user=user,
+            user=user,
         ).order_by('id')
 
-        overdue_tasks_in_week = Task.objects.filter(
+        overdue_tasks_in_week = TaskWithArchive.objects.filter(
             deadline__gte=start_of_period,
             deadline__lte=end_of_period,
             status=3,
-            project__user=user,
+            user=user,
         ).order_by('id')
 
         tasks = tasks_created_in_week | tasks_finished_in_week | overdue_tasks_in_week
@@ -98,23 +98,23 @@ def create_monthly_report():
         _, num_days_in_previous_month = calendar.monthrange(start_of_previous_month.year, start_of_previous_month.month)
         start_of_previous_month = start_of_previous_month.replace(day=1)
         end_of_previous_month = start_of_previous_month + timedelta(days=num_days_in_previous_month)
-        tasks_created_in_month = Task.objects.filter(
+        tasks_created_in_month = TaskWithArchive.objects.filter(
             created_at__gte=start_of_previous_month,
             created_at__lt=end_of_previous_month,
-            project__user=user,
+            user=user,
         ).order_by('id')
 
-        tasks_finished_in_month = Task.objects.filter(
+        tasks_finished_in_month = TaskWithArchive.objects.filter(
             finish_at__gte=start_of_previous_month,
             finish_at__lt=end_of_previous_month,
-            project__user=user,
+            user=user,
         ).order_by('id')
 
-        overdue_tasks_in_month = Task.objects.filter(
+        overdue_tasks_in_month = TaskWithArchive.objects.filter(
             deadline__gte=start_of_previous_month,
             deadline__lte=end_of_previous_month,
             status=3,
-            project__user=user,
+            user=user,
         ).order_by('id')
 
         tasks = tasks_created_in_month | tasks_finished_in_month | overdue_tasks_in_month
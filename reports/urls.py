@@ -1,7 +1,12 @@
+from django.conf import settings
 from django.urls import path
 
 from reports.views import *
 
+if settings.ASYNC_READ_VIEWS:
+    from reports.async_views import AsyncGetAllWeeklyReport as GetAllWeeklyReport, \
+        AsyncGetAllMonthlyReport as GetAllMonthlyReport
+
 urlpatterns = [
     path('get-all-weakly/', GetAllWeeklyReport.as_view(), name='get-all-weakly'),
     path('get-all-monthly/', GetAllMonthlyReport.as_view(), name='get-all-monthly'),
@@ -5,11 +5,11 @@ from rest_framework.permissions import IsAuthenticated
 from reports.models import Report
 from reports.permissions import IsOwner
 from reports.serializers import ReportsSerializer, ReportDetailSerializer
-from tasks.utils import PaginationAPIResponse, APIResponse, Pagination
+from tasks.utils import PaginationAPIResponse, APIResponse, Pagination, CachedResponseMixin
 
 
 # Create your views here.
-class GetAllWeeklyReport(generics.ListAPIView):
+class GetAllWeeklyReport(CachedResponseMixin, generics.ListAPIView):
     queryset = Report.objects.all()
     serializer_class = ReportsSerializer
 
@@ -22,7 +22,7 @@ class GetAllWeeklyReport(generics.ListAPIView):
         return Report.objects.filter(user=self.request.user, type=1)
 
 
-class GetAllMonthlyReport(generics.ListAPIView):
+class GetAllMonthlyReport(CachedResponseMixin, generics.ListAPIView):
     queryset = Report.objects.all()
     serializer_class = ReportsSerializer
 
@@ -0,0 +1,177 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.db.models import Min
+from django.db.models.signals import post_save
+
+from notifications.models import Notification
+from tasks.models import ArchivedTask, Project, Task, TaskWithArchive, Tombstone
+from tasks.utils import bump_user_cache_version
+
+ARCHIVE_INDEXES = [
+    # Reports, by finish and by creation date.
+    ('tasks_archive_user_finish_at', '(user_id, finish_at)'),
+    ('tasks_archive_user_created_at', '(user_id, created_at)'),
+    # ORM cascades when a project or column is deleted.
+    ('tasks_archive_project', '(project_id)'),
+    ('tasks_archive_column', '(column_id)'),
+    ('tasks_archive_search_vector', 'USING gin (search_vector)'),
+]
+
+
+def create_archive(cursor):
+    """Create the archive table, its indexes and the view over live and archived tasks.
+
+    Safe to run on every migrate: fields added to Task since the archive
+    was created are added to it too, and the view is rebuilt.
+    """
+    qn = connection.ops.quote_name
+    tasks, archive, view = Task._meta.db_table, ArchivedTask._meta.db_table, TaskWithArchive._meta.db_table
+
+    # finish_at is the partition key, so it joins the primary key.
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS {qn(archive)} ('
+        f' LIKE {qn(tasks)} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE,'
+        f' archived_at timestamp with time zone NOT NULL DEFAULT NOW(),'
+        f' PRIMARY KEY (id, finish_at)'
+        f') PARTITION BY RANGE (finish_at)'
+    )
+    for name, definition in ARCHIVE_INDEXES:
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {qn(name)} ON {qn(archive)} {definition}')
+    add_missing_columns(cursor)
+
+    columns = ', '.join(qn(field.column) for field in Task._meta.concrete_fields)
+    drop_archive_view(cursor)
+    cursor.execute(
+        f'CREATE VIEW {qn(view)} AS'
+        f' SELECT {columns}, false AS archived FROM {qn(tasks)}'
+        f' UNION ALL SELECT {columns}, true AS archived FROM {qn(archive)}'
+    )
+
+
+def add_missing_columns(cursor):
+    """Add the columns of Task fields that ``tasks_archive`` does not have yet."""
+    qn = connection.ops.quote_name
+    archive = ArchivedTask._meta.db_table
+    cursor.execute(
+        "SELECT column_name FROM information_schema.columns WHERE table_schema = current_schema() AND table_name = %s",
+        [archive]
+    )
+    existing = {column for column, in cursor.fetchall()}
+
+    schema_editor = cursor.db.schema_editor()
+    for field in ArchivedTask._meta.concrete_fields:
+        if field.column in existing:
+            continue
+        definition, params = schema_editor.column_sql(ArchivedTask, field, include_default=True)
+        cursor.execute(f'ALTER TABLE {qn(archive)} ADD COLUMN IF NOT EXISTS {qn(field.column)} {definition}', params)
+
+
+def drop_archive_view(cursor):
+    """Drop the view, which would otherwise block migrations altering or dropping ``tasks`` columns."""
+    cursor.execute(f'DROP VIEW IF EXISTS {connection.ops.quote_name(TaskWithArchive._meta.db_table)}')
+
+
+def create_partitions(cursor, start, end):
+    """Create the monthly archive partitions covering ``start`` up to ``end``."""
+    qn = connection.ops.quote_name
+    archive = ArchivedTask._meta.db_table
+    start, end = start.astimezone(dt_timezone.utc), end.astimezone(dt_timezone.utc)
+
+    month = datetime(start.year, start.month, 1, tzinfo=dt_timezone.utc)
+    while month <= end:
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {qn(f"{archive}_{month:%Y_%m}")} PARTITION OF {qn(archive)}'
+            f' FOR VALUES FROM (%s) TO (%s)',
+            [month, next_month]
+        )
+        month = next_month
+
+
+def archive_tasks(before, batch_size):
+    """Move the tasks finished before ``before`` into the archive; returns how many were moved.
+
+    Each batch commits on its own, so boards stay writable while a
+    large backlog is archived.
+    """
+    oldest = Task.objects.filter(status=Task.DONE, finish_at__lt=before).aggregate(oldest=Min('finish_at'))['oldest']
+    if oldest is None:
+        return 0
+
+    with connection.cursor() as cursor:
+        create_partitions(cursor, oldest, before)
+
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = archive_batch(before, batch_size)
+        moved += len(rows)
+        if len(rows) < batch_size:
+            return moved
+
+
+def archive_batch(before, batch_size):
+    qn = connection.ops.quote_name
+    tasks, archive = Task._meta.db_table, ArchivedTask._meta.db_table
+    columns = ', '.join(qn(field.column) for field in Task._meta.concrete_fields if not field.generated)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'WITH moved AS ('
+            f'  DELETE FROM {qn(tasks)} WHERE id IN ('
+            f'   SELECT id FROM {qn(tasks)} WHERE status = %s AND finish_at < %s'
+            f'   ORDER BY finish_at LIMIT %s FOR UPDATE SKIP LOCKED'
+            f'  ) RETURNING {columns}'
+            f') INSERT INTO {qn(archive)} ({columns}, archived_at) SELECT {columns}, NOW() FROM moved'
+            f' RETURNING id, project_id, user_id',
+            [Task.DONE, before, batch_size]
+        )
+        rows = cursor.fetchall()
+    if not rows:
+        return rows
+
+    # Notifications only concern unfinished tasks; nothing reads them once archived.
+    Notification.objects.filter(task_id__in=[task_id for task_id, _, _ in rows]).delete()
+
+    # To synced clients an archived task is a deleted one.
+    tombstones = [Tombstone(project_id=project_id, model=Tombstone.TASK, object_id=task_id)
+                  for task_id, project_id, _ in rows]
+    Project.stamp_revisions(tombstones)
+    Tombstone.objects.bulk_create(tombstones)
+
+    for user_id in {user_id for _, _, user_id in rows}:
+        transaction.on_commit(lambda user_id=user_id: bump_user_cache_version(user_id))
+    return rows
+
+
+def restore_task(task_id, user):
+    """Move an archived task of ``user`` back to the end of its column; returns the task, or None."""
+    qn = connection.ops.quote_name
+    tasks, archive = Task._meta.db_table, ArchivedTask._meta.db_table
+
+    with transaction.atomic():
+        archived = ArchivedTask.objects.filter(
+            id=task_id, user=user, project__deleted_at__isnull=True
+        ).select_for_update(of=('self',)).first()
+        if archived is None:
+            return None
+
+        fields = [field for field in Task._meta.concrete_fields if not field.generated]
+        replaced = {'rank': '%s', 'updated_at': 'NOW()'}
+        with connection.cursor() as cursor:
+            # Plain SQL keeps created_at, which a model save would reset.
+            cursor.execute(
+                f'WITH restored AS ('
+                f'  DELETE FROM {qn(archive)} WHERE id = %s AND finish_at = %s RETURNING *'
+                f') INSERT INTO {qn(tasks)} ({", ".join(qn(field.column) for field in fields)})'
+                f' SELECT {", ".join(replaced.get(field.column, qn(field.column)) for field in fields)} FROM restored',
+                [archived.id, archived.finish_at, Task.next_ranks(archived.column_id)[0]]
+            )
+        Tombstone.objects.filter(project_id=archived.project_id, model=Tombstone.TASK, object_id=archived.id).delete()
+
+        # The receivers stamp the revision, publish the event and bump the cache version.
+        task = Task.objects.select_related('project').get(id=archived.id)
+        post_save.send(sender=Task, instance=task, created=True, update_fields=None, raw=False,
+                       using=connection.alias)
+    return task
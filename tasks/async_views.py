@@ -0,0 +1,149 @@
+import asyncio
+from http import HTTPStatus
+
+import orjson
+from adrf.views import APIView
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from tasks.authentication import QueryParamJWTAuthentication
+from tasks.events import get_event_layer, RESYNC
+from tasks.models import Project, TableColumn
+from tasks.renderers import ORJSONRenderer, PassthroughRenderer
+from tasks.utils import AsyncListMixin, APIResponse, aget_user_cache_version
+from tasks.views import TaskListView, AllTaskListView, OverdueTasksListView, OnDeadlineTasksListView, \
+    TasksByMonthView, CALENDAR_CACHE_TIMEOUT
+
+
+# Async versions of the hot read endpoints, routed instead of the sync ones
+# when ASYNC_READ_VIEWS is set (see README). Responses are identical.
+class AsyncTaskListView(AsyncListMixin, APIView, TaskListView):
+
+    async def alist(self, request, *args, **kwargs):
+        project = await Project.objects.select_related('user').filter(id=self.kwargs['project_id']).afirst()
+        if project is None:
+            return APIResponse({
+                'error': 'Project not found'
+            }, status_code=status.HTTP_404_NOT_FOUND)
+
+        try:
+            tasks_per_column = self.get_tasks_per_column()
+        except ValueError:
+            return APIResponse({"error": "tasks_per_column must be a positive integer."},
+                               status_code=HTTPStatus.BAD_REQUEST)
+
+        columns = TableColumn.objects.filter(project=project)
+        page = await sync_to_async(self.paginate_queryset)(columns)
+        page_columns = [column async for column in columns] if page is None else page
+
+        tasks = [task async for task in self.get_board_tasks(project, page_columns, tasks_per_column)]
+        return self.board_response(project, page_columns, tasks, paginated=page is not None)
+
+
+class AsyncTaskRowListMixin(AsyncListMixin):
+
+    async def alist(self, request, *args, **kwargs):
+        try:
+            time_filter = self.get_time_filter()
+        except ValueError:
+            return APIResponse({"error": "Invalid time format, use 'YYYY-MM-DD HH:mm:ss'."},
+                               status_code=HTTPStatus.BAD_REQUEST)
+
+        queryset = self.filter_queryset(self.get_queryset(time_filter))
+
+        page = await sync_to_async(self.paginate_queryset)(queryset)
+        if page is not None:
+            return self.rows_response(page, paginated=True)
+        return self.rows_response([row async for row in queryset], paginated=False)
+
+
+class AsyncAllTaskListView(AsyncTaskRowListMixin, APIView, AllTaskListView):
+    pass
+
+
+class AsyncOverdueTasksListView(AsyncTaskRowListMixin, APIView, OverdueTasksListView):
+    pass
+
+
+class AsyncOnDeadlineTasksListView(AsyncTaskRowListMixin, APIView, OnDeadlineTasksListView):
+    pass
+
+
+class AsyncTasksByMonthView(APIView, TasksByMonthView):
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            year, month = self.get_month()
+        except ValueError:
+            return APIResponse({"error": "Invalid month or year."}, status_code=400)
+
+        cache_key = self.get_cache_key(year, month, await aget_user_cache_version(request.user.id))
+        tasks_by_day = await cache.aget(cache_key)
+        if tasks_by_day is not None:
+            return APIResponse(tasks_by_day)
+
+        days, queryset, aggregates = self.get_counts_query(year, month)
+        tasks_by_day = self.group_by_day(days, await queryset.aaggregate(**aggregates))
+        await cache.aset(cache_key, tasks_by_day, CALENDAR_CACHE_TIMEOUT)
+
+        return APIResponse(tasks_by_day)
+
+
+class ProjectEventsView(APIView):
+    """Server-sent events with the changes to one project's board.
+
+    Each event is named after its model (``task``, ``column``, ``project``)
+    and carries the revision it produced as its id. The first event,
+    ``ready``, carries the current revision. A client whose last seen
+    revision is older, or that receives ``resync``, fetches the missed
+    changes from ``sync/<project_id>/?since=``. Needs the ASGI server.
+    """
+    authentication_classes = [JWTAuthentication, QueryParamJWTAuthentication]
+    renderer_classes = [ORJSONRenderer, PassthroughRenderer]
+    heartbeat_interval = 15
+    retry_ms = 3000
+
+    async def get(self, request, *args, **kwargs):
+        project_id = self.kwargs['project_id']
+        if not await Project.objects.filter(id=project_id, user=request.user).aexists():
+            return APIResponse({'error': 'Project not found'}, status_code=status.HTTP_404_NOT_FOUND)
+
+        response = StreamingHttpResponse(self.stream(project_id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Keep nginx from buffering the stream.
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def stream(self, project_id):
+        # Subscribe before reading the revision so nothing falls in between.
+        async with get_event_layer().subscribe(project_id) as queue:
+            revision = await Project.objects.filter(id=project_id).values_list('revision', flat=True).afirst()
+            yield f'retry: {self.retry_ms}\n'.encode()
+            yield self.format('ready', {'revision': revision}, revision)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield b': keep-alive\n\n'
+                    continue
+
+                if event is RESYNC:
+                    yield self.format('resync', {'revision': revision})
+                    continue
+
+                revision = max(revision or 0, event.get('revision') or 0)
+                yield self.format(event['model'], event, event.get('revision'))
+                if event['model'] == 'project' and event['action'] == 'deleted':
+                    return
+
+    @staticmethod
+    def format(name, data, event_id=None):
+        lines = [f'event: {name}']
+        if event_id is not None:
+            lines.append(f'id: {event_id}')
+        lines.append(f'data: {orjson.dumps(data).decode()}')
+        return ('\n'.join(lines) + '\n\n').encode()
@@ -0,0 +1,16 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+class QueryParamJWTAuthentication(JWTAuthentication):
+    """Read the access token from ``?access_token=``.
+
+    Only for endpoints opened with EventSource, which cannot send headers.
+    """
+
+    def authenticate(self, request):
+        raw_token = request.query_params.get('access_token')
+        if not raw_token:
+            return None
+
+        validated_token = self.get_validated_token(raw_token.encode())
+        return self.get_user(validated_token), validated_token
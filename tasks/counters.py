@@ -0,0 +1,89 @@
+from django.db import connection
+
+from tasks.models import Project, TableColumn, Task
+
+# Counter field -> the task status it counts; task_count counts every status.
+STATUS_COUNTERS = {
+    'doing_count': Task.DOING,
+    'done_count': Task.DONE,
+    'overdue_count': Task.OVERDUE,
+}
+COUNTERS = ['task_count', *STATUS_COUNTERS]
+
+# Trigger event -> transition tables, and the changed rows as +1 / -1.
+TRANSITIONS = {
+    'INSERT': ('REFERENCING NEW TABLE AS new_rows',
+               'SELECT project_id, column_id, status, 1 AS n FROM new_rows'),
+    'UPDATE': ('REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+               'SELECT project_id, column_id, status, 1 AS n FROM new_rows'
+               ' UNION ALL SELECT project_id, column_id, status, -1 AS n FROM old_rows'),
+    'DELETE': ('REFERENCING OLD TABLE AS old_rows',
+               'SELECT project_id, column_id, status, -1 AS n FROM old_rows'),
+}
+
+
+def counter_columns(aggregate):
+    """SELECT list computing every counter with ``aggregate``, 'SUM(n)' or 'COUNT(*)'."""
+    columns = [f'{aggregate} AS task_count']
+    columns += [f'COALESCE({aggregate} FILTER (WHERE status = {status}), 0) AS {name}'
+                for name, status in STATUS_COUNTERS.items()]
+    return ', '.join(columns)
+
+
+def create_counter_triggers(cursor):
+    """(Re)create the triggers keeping the task counters of projects and columns exact.
+
+    Statement-level, so bulk writes update each counter row once. Writes
+    that leave project, column and status alone (ranks, revisions, text)
+    change nothing.
+    """
+    qn = connection.ops.quote_name
+    tasks, projects = qn(Task._meta.db_table), qn(Project._meta.db_table)
+
+    def apply(model, key):
+        table = qn(model._meta.db_table)
+        sets = ', '.join(f'{name} = {table}.{name} + delta.{name}' for name in COUNTERS)
+        changed = ' OR '.join(f'delta.{name} <> 0' for name in COUNTERS)
+        return (f'UPDATE {table} SET {sets}'
+                f' FROM (SELECT {key} AS id, {counter_columns("SUM(n)")} FROM changes GROUP BY {key}) delta'
+                f' WHERE {table}.id = delta.id AND ({changed})')
+
+    for event, (referencing, changes) in TRANSITIONS.items():
+        name = f'tasks_count_{event.lower()}'
+        cursor.execute(
+            f'CREATE OR REPLACE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $body$ BEGIN'
+            # Projects are locked before columns, the order stamp_revisions takes them in, and in id
+            # order; moves inside one project change no project count but still serialize on it.
+            f' PERFORM 1 FROM {projects} WHERE id IN (SELECT project_id FROM ({changes}) changes)'
+            f' ORDER BY id FOR UPDATE;'
+            f' WITH changes AS ({changes}) {apply(Project, "project_id")};'
+            f' WITH changes AS ({changes}) {apply(TableColumn, "column_id")};'
+            f' RETURN NULL;'
+            f' END $body$'
+        )
+        cursor.execute(f'DROP TRIGGER IF EXISTS {name} ON {tasks}')
+        cursor.execute(
+            f'CREATE TRIGGER {name} AFTER {event} ON {tasks} {referencing}'
+            f' FOR EACH STATEMENT EXECUTE FUNCTION {name}()'
+        )
+
+
+def reconcile_counters(cursor):
+    """Recount every project and column from ``tasks``; returns {model name: rows corrected}.
+
+    Lock ``tasks`` against writes first, or a concurrent write can be lost.
+    """
+    qn = connection.ops.quote_name
+    corrected = {}
+    for model, key in ((TableColumn, 'column_id'), (Project, 'project_id')):
+        table = qn(model._meta.db_table)
+        counts = f'SELECT {key} AS id, {counter_columns("COUNT(*)")} FROM {qn(Task._meta.db_table)} GROUP BY {key}'
+        actual = ', '.join(f'COALESCE(counts.{name}, 0)' for name in COUNTERS)
+        cursor.execute(
+            f'UPDATE {table} SET ({", ".join(COUNTERS)}) = ({actual})'
+            f' FROM {table} target LEFT JOIN ({counts}) counts ON counts.id = target.id'
+            f' WHERE {table}.id = target.id'
+            f' AND ({", ".join(f"{table}.{name}" for name in COUNTERS)}) IS DISTINCT FROM ({actual})'
+        )
+        corrected[model._meta.model_name] = cursor.rowcount
+    return corrected
@@ -0,0 +1,140 @@
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from notifications.models import Notification
+from tasks.events import publish_on_commit, object_event
+from tasks.models import ArchivedTask, Project, TableColumn, Task, Tombstone
+from tasks.utils import bump_user_cache_version
+
+# Finished deletions stay visible to the progress endpoint this long.
+PROGRESS_TIMEOUT = 60 * 60 * 24
+
+
+def progress_key(project_id):
+    return f'project_deletion:{project_id}'
+
+
+def get_progress(project_id):
+    return cache.get(progress_key(project_id))
+
+
+def set_progress(project_id, progress, timeout=None):
+    cache.set(progress_key(project_id), progress, timeout)
+
+
+def hide_project(project):
+    """Take ``project`` out of the API at once; purge_project removes its rows later.
+
+    Must run inside the transaction that hides it.
+    """
+    project.deleted_at = timezone.now()
+    Project.all_objects.filter(id=project.id).update(deleted_at=project.deleted_at)
+    progress = {'status': 'pending', 'user_id': project.user_id, 'total': None, 'deleted': 0}
+    transaction.on_commit(lambda: set_progress(project.id, progress))
+    publish_on_commit(project.id, object_event('project', 'deleted', project))
+    transaction.on_commit(lambda: bump_user_cache_version(project.user_id))
+
+
+def delete_tasks(user_id, task_ids):
+    """Delete the tasks of ``user_id`` among ``task_ids`` in one statement; returns the ids deleted.
+
+    Skips the ORM collector, which would bury each task with statements of
+    its own; tombstones and revisions are written once for the batch, as
+    archive_batch does. Must run inside the transaction that deletes them.
+    """
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {qn(Task._meta.db_table)} WHERE user_id = %s AND id = ANY(%s::uuid[])'
+            f' AND project_id NOT IN (SELECT id FROM {qn(Project._meta.db_table)} WHERE deleted_at IS NOT NULL)'
+            f' RETURNING id, project_id',
+            [user_id, list(task_ids)]
+        )
+        rows = cursor.fetchall()
+    if not rows:
+        return set()
+
+    Notification.objects.filter(task_id__in=[task_id for task_id, _ in rows]).delete()
+
+    tombstones = [Tombstone(project_id=project_id, model=Tombstone.TASK, object_id=task_id)
+                  for task_id, project_id in rows]
+    Project.stamp_revisions(tombstones)
+    Tombstone.objects.bulk_create(tombstones)
+
+    transaction.on_commit(lambda: bump_user_cache_version(user_id))
+    return {task_id for task_id, _ in rows}
+
+
+def purge_statements(project):
+    """(label, SQL, params) deleting one batch of the project's rows and returning how many went."""
+    qn = connection.ops.quote_name
+    tasks, archive = qn(Task._meta.db_table), qn(ArchivedTask._meta.db_table)
+    return [
+        # Notifications have no foreign key to cascade from; they go with their tasks.
+        ('task',
+         f'WITH doomed AS ('
+         f'  DELETE FROM {tasks} WHERE id IN ('
+         f'   SELECT id FROM {tasks} WHERE user_id = %s AND project_id = %s LIMIT %s'
+         f'  ) RETURNING id'
+         f'), notified AS ('
+         f'  DELETE FROM {qn(Notification._meta.db_table)} WHERE task_id IN (SELECT id FROM doomed)'
+         f') SELECT COUNT(*) FROM doomed',
+         [project.user_id, project.id]),
+        ('archived_task',
+         f'WITH doomed AS ('
+         f'  DELETE FROM {archive} WHERE (id, finish_at) IN ('
+         f'   SELECT id, finish_at FROM {archive} WHERE project_id = %s LIMIT %s'
+         f'  ) RETURNING 1'
+         f') SELECT COUNT(*) FROM doomed',
+         [project.id]),
+        # Columns last among the board rows: tasks reference them.
+        ('column', *delete_batch(TableColumn, project)),
+        ('tombstone', *delete_batch(Tombstone, project)),
+    ]
+
+
+def delete_batch(model, project):
+    table = connection.ops.quote_name(model._meta.db_table)
+    return (
+        f'WITH doomed AS ('
+        f'  DELETE FROM {table} WHERE id IN (SELECT id FROM {table} WHERE project_id = %s LIMIT %s) RETURNING 1'
+        f') SELECT COUNT(*) FROM doomed',
+        [project.id]
+    )
+
+
+def count_rows(project):
+    return (project.task_count
+            + ArchivedTask.objects.filter(project_id=project.id).count()
+            + TableColumn.objects.filter(project_id=project.id).count())
+
+
+def purge_project(project_id, batch_size):
+    """Delete a hidden project and everything in it, ``batch_size`` rows per transaction.
+
+    Bypasses the ORM cascade, which would load every row first. Safe to
+    run again after an interruption.
+    """
+    project = Project.all_objects.filter(id=project_id, deleted_at__isnull=False).first()
+    if project is None:
+        return
+
+    progress = {'status': 'running', 'user_id': project.user_id, 'total': count_rows(project), 'deleted': 0}
+    set_progress(project.id, progress)
+
+    for label, sql, params in purge_statements(project):
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(sql, [*params, batch_size])
+                deleted = cursor.fetchone()[0]
+            if label != 'tombstone':
+                progress['deleted'] += deleted
+                set_progress(project.id, progress)
+            if deleted < batch_size:
+                break
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {connection.ops.quote_name(Project._meta.db_table)} WHERE id = %s', [project.id])
+    progress['status'] = 'done'
+    set_progress(project.id, progress, PROGRESS_TIMEOUT)
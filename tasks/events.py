@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+import orjson
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Queued in place of the backlog of a subscriber that fell too far behind.
+RESYNC = {'model': 'project', 'action': 'resync'}
+
+
+class InMemoryEventLayer:
+    """Fan board change events out to the subscribers in this process.
+
+    Enough for tests and a single worker; ``RedisEventLayer`` extends it
+    to every worker. ``publish`` is called from sync code in any thread,
+    subscribers read from an asyncio queue on their own event loop.
+    """
+    queue_size = 1000
+
+    def __init__(self, **options):
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def publish(self, project_id, event):
+        self.dispatch(str(project_id), event)
+
+    def dispatch(self, project_id, event):
+        with self.lock:
+            subscribers = list(self.subscribers.get(project_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self.offer, queue, event)
+
+    @staticmethod
+    def offer(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC)
+
+    @asynccontextmanager
+    async def subscribe(self, project_id):
+        """Yield a queue receiving the events of ``project_id`` until the block exits."""
+        project_id = str(project_id)
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.queue_size))
+        with self.lock:
+            first = not self.subscribers[project_id]
+            self.subscribers[project_id].add(subscriber)
+        try:
+            if first:
+                await self.listen(project_id)
+            yield subscriber[1]
+        finally:
+            with self.lock:
+                self.subscribers[project_id].discard(subscriber)
+                last = not self.subscribers[project_id]
+                if last:
+                    del self.subscribers[project_id]
+            if last:
+                await self.unlisten(project_id)
+
+    async def listen(self, project_id):
+        pass
+
+    async def unlisten(self, project_id):
+        pass
+
+
+class RedisEventLayer(InMemoryEventLayer):
+    """Publish through Redis pub/sub, one channel per project.
+
+    Each worker holds a single subscription connection and fans the
+    messages out to its local subscribers.
+    """
+
+    def __init__(self, url, prefix='tasks:events:', **options):
+        super().__init__(**options)
+        self.url = url
+        self.prefix = prefix
+        self.publisher = redis.Redis.from_url(url)
+        self.pubsub = None
+        self.reader = None
+
+    def publish(self, project_id, event):
+        self.publisher.publish(f'{self.prefix}{project_id}', orjson.dumps(event))
+
+    async def listen(self, project_id):
+        if self.pubsub is None:
+            self.pubsub = redis.asyncio.Redis.from_url(self.url).pubsub()
+        await self.pubsub.subscribe(f'{self.prefix}{project_id}')
+        if self.reader is None or self.reader.done():
+            self.reader = asyncio.create_task(self.read())
+
+    async def unlisten(self, project_id):
+        await self.pubsub.unsubscribe(f'{self.prefix}{project_id}')
+
+    async def read(self):
+        while True:
+            try:
+                message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except Exception:
+                logger.exception("Reading board events from Redis failed")
+                await asyncio.sleep(1)
+                continue
+            if message is None:
+                continue
+            project_id = message['channel'].decode().removeprefix(self.prefix)
+            self.dispatch(project_id, orjson.loads(message['data']))
+
+
+@lru_cache(maxsize=None)
+def get_event_layer():
+    config = settings.TASK_EVENTS
+    return import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+
+
+def publish_on_commit(project_id, event):
+    """Publish once the change is visible; a failing broker never fails the write."""
+    def publish():
+        try:
+            get_event_layer().publish(project_id, event)
+        except Exception:
+            logger.exception("Publishing a board event failed")
+
+    transaction.on_commit(publish)
+
+
+def object_event(model, action, obj, data=None):
+    event = {'model': model, 'action': action, 'id': str(obj.pk), 'revision': obj.revision}
+    if data is not None:
+        event['data'] = data
+    return event
@@ -0,0 +1,249 @@
+import csv
+import io
+import tempfile
+import uuid
+
+import orjson
+from django.db import connection, transaction, DatabaseError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from tasks.models import Project, TableColumn, Task
+from tasks.utils import bump_user_cache_version
+
+
+class TaskImportError(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+class TaskImporter:
+    """Load boards exported from other tools (or by ExportView) with COPY.
+
+    Records are the ones ExportView writes: projects, columns and tasks
+    tagged with their type and linked by the source ``id`` /
+    ``project_id`` / ``column_id`` values. They are validated one at a
+    time while streaming into temporary files, COPYed into temporary
+    staging tables and merged into the real tables with three
+    INSERT ... SELECT statements. Every import creates new projects.
+    """
+    max_errors = 100
+    staging_tables = {
+        'project': ('import_projects', ['source_id', 'id', 'name']),
+        'column': ('import_columns', ['source_id', 'project_source_id', 'id', 'name', 'order', 'is_done_column',
+                                      'line']),
+        'task': ('import_tasks', ['project_source_id', 'column_source_id', 'id', 'title', 'content', 'deadline',
+                                  'priority', 'status', 'finish_at', 'created_at', 'line']),
+    }
+
+    def __init__(self, user, import_type='ndjson'):
+        if import_type not in ('ndjson', 'csv'):
+            raise ValueError("Invalid import type, use 'ndjson' or 'csv'.")
+        self.user = user
+        self.import_type = import_type
+        self.errors = []
+        self.counts = {'project': 0, 'column': 0, 'task': 0}
+
+    def run(self, stream):
+        """Import the records read from the text ``stream``; returns the imported counts."""
+        files = {record_type: tempfile.TemporaryFile(mode='w+', newline='') for record_type in self.staging_tables}
+        try:
+            writers = {record_type: csv.writer(file) for record_type, file in files.items()}
+            for line, record in self.read_records(stream):
+                row = self.validate(line, record)
+                if row is not None and not self.errors:
+                    writers[record['type']].writerow(row)
+                    self.counts[record['type']] += 1
+                if len(self.errors) >= self.max_errors:
+                    break
+
+            if self.errors:
+                raise TaskImportError(self.errors)
+
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    self.create_staging_tables(cursor)
+                    for record_type, file in files.items():
+                        table, columns = self.staging_tables[record_type]
+                        file.seek(0)
+                        try:
+                            cursor.copy_expert(
+                                f'COPY {table} ({", ".join(map(connection.ops.quote_name, columns))}) '
+                                f'FROM STDIN WITH (FORMAT csv)',
+                                file
+                            )
+                        except DatabaseError as e:
+                            raise TaskImportError([{'line': None, 'errors': str(e).strip()}])
+                    self.check_references(cursor)
+                    self.merge(cursor)
+                transaction.on_commit(lambda: bump_user_cache_version(self.user.id))
+        finally:
+            for file in files.values():
+                file.close()
+
+        return self.counts
+
+    def read_records(self, stream):
+        if self.import_type == 'csv':
+            for line, record in enumerate(csv.DictReader(stream), start=2):
+                yield line, {key: value if value != '' else None for key, value in record.items()}
+        else:
+            for line, text in enumerate(stream, start=1):
+                if not text.strip():
+                    continue
+                try:
+                    record = orjson.loads(text)
+                except orjson.JSONDecodeError:
+                    self.errors.append({'line': line, 'errors': 'Invalid JSON.'})
+                    continue
+                if not isinstance(record, dict):
+                    self.errors.append({'line': line, 'errors': 'Each line must be a JSON object.'})
+                    continue
+                yield line, record
+
+    def validate(self, line, record):
+        errors = {}
+        record_type = record.get('type')
+
+        def required(field, max_length=None):
+            value = record.get(field)
+            if value is None or str(value).strip() == '':
+                errors[field] = 'This field is required.'
+                return None
+            value = str(value)
+            if max_length and len(value) > max_length:
+                errors[field] = f'Ensure this field has no more than {max_length} characters.'
+            return value
+
+        def integer(field, default=None, choices=None):
+            value = record.get(field)
+            if value is None:
+                if default is None:
+                    errors[field] = 'This field is required.'
+                return default
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                errors[field] = 'A valid integer is required.'
+                return None
+            if choices and value not in choices:
+                errors[field] = f'"{value}" is not a valid choice.'
+            return value
+
+        def date_time(field, is_required=False):
+            value = record.get(field)
+            if value is None:
+                if is_required:
+                    errors[field] = 'This field is required.'
+                return None
+            try:
+                parsed = parse_datetime(str(value))
+            except ValueError:
+                parsed = None
+            if parsed is None:
+                errors[field] = 'Datetime has wrong format.'
+                return None
+            if timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed)
+            return parsed.isoformat()
+
+        if record_type == 'project':
+            row = [required('id'), uuid.uuid4(), required('name', 255)]
+        elif record_type == 'column':
+            is_done_column = str(record.get('is_done_column') or '').lower() in ('1', 'true', 't', 'yes')
+            row = [required('id'), required('project_id'), uuid.uuid4(), required('name', 255),
+                   integer('order', default=0), is_done_column, line]
+        elif record_type == 'task':
+            # CSV exports carry the task title in the shared ``name`` column.
+            title = required('title' if 'title' in record else 'name', 255)
+            row = [required('project_id'), required('column_id'), uuid.uuid4(), title, record.get('content'),
+                   date_time('deadline', is_required=True), integer('priority', choices=dict(Task.PRIORITY_CHOICES)),
+                   integer('status', default=Task.DOING, choices=dict(Task.STATUS_CHOICES)), date_time('finish_at'),
+                   date_time('created_at'), line]
+        else:
+            errors['type'] = "Must be one of 'project', 'column' or 'task'."
+            row = None
+
+        if errors:
+            self.errors.append({'line': line, 'errors': errors})
+            return None
+        return row
+
+    def create_staging_tables(self, cursor):
+        cursor.execute(
+            'CREATE TEMPORARY TABLE import_projects ('
+            ' source_id text PRIMARY KEY, id uuid NOT NULL, name text NOT NULL'
+            ') ON COMMIT DROP'
+        )
+        cursor.execute(
+            'CREATE TEMPORARY TABLE import_columns ('
+            ' source_id text NOT NULL, project_source_id text NOT NULL, id uuid NOT NULL, name text NOT NULL,'
+            ' "order" integer NOT NULL, is_done_column boolean NOT NULL, line integer NOT NULL,'
+            ' PRIMARY KEY (project_source_id, source_id)'
+            ') ON COMMIT DROP'
+        )
+        cursor.execute(
+            'CREATE TEMPORARY TABLE import_tasks ('
+            ' project_source_id text NOT NULL, column_source_id text NOT NULL, id uuid NOT NULL,'
+            ' title text NOT NULL, content text, deadline timestamptz NOT NULL, priority integer NOT NULL,'
+            ' status integer NOT NULL, finish_at timestamptz, created_at timestamptz, line integer NOT NULL'
+            ') ON COMMIT DROP'
+        )
+
+    def check_references(self, cursor):
+        cursor.execute(
+            'SELECT c.line FROM import_columns c'
+            ' LEFT JOIN import_projects p ON p.source_id = c.project_source_id'
+            ' WHERE p.id IS NULL ORDER BY c.line LIMIT %s',
+            [self.max_errors]
+        )
+        errors = [{'line': line, 'errors': {'project_id': 'Unknown project.'}} for line, in cursor.fetchall()]
+        cursor.execute(
+            'SELECT t.line FROM import_tasks t'
+            ' LEFT JOIN import_columns c'
+            '  ON c.project_source_id = t.project_source_id AND c.source_id = t.column_source_id'
+            ' WHERE c.id IS NULL ORDER BY t.line LIMIT %s',
+            [self.max_errors]
+        )
+        errors += [{'line': line, 'errors': {'column_id': 'Unknown column in this project.'}}
+                   for line, in cursor.fetchall()]
+        if errors:
+            raise TaskImportError(errors)
+
+    def merge(self, cursor):
+        # Ranks are fixed-width decimal strings, so they sort like the row numbers they encode.
+        cursor.execute(
+            f'INSERT INTO {Project._meta.db_table}'
+            f' (id, name, created_at, updated_at, user_id, revision, pruned_revision)'
+            f' SELECT id, name, NOW(), NOW(), %s, 1, 0 FROM import_projects',
+            [self.user.id]
+        )
+        cursor.execute(
+            f'INSERT INTO {TableColumn._meta.db_table}'
+            f' (id, name, "order", rank, is_done_column, project_id, created_at, updated_at, revision)'
+            f' SELECT c.id, c.name, c."order",'
+            f"  'i' || LPAD((ROW_NUMBER() OVER (PARTITION BY c.project_source_id ORDER BY c.\"order\", c.line))::text,"
+            f"   10, '0'),"
+            f'  c.is_done_column, p.id, NOW(), NOW(), 1'
+            f' FROM import_columns c JOIN import_projects p ON p.source_id = c.project_source_id'
+        )
+        cursor.execute(
+            f'INSERT INTO {Task._meta.db_table}'
+            f' (id, title, content, deadline, priority, status, finish_at, project_id, column_id, user_id, rank,'
+            f'  created_at, updated_at, revision)'
+            f' SELECT t.id, t.title, t.content, t.deadline, t.priority, t.status,'
+            f'  CASE WHEN c.is_done_column THEN COALESCE(t.finish_at, NOW()) ELSE NULL END,'
+            f'  p.id, c.id, %s,'
+            f"  'i' || LPAD((ROW_NUMBER() OVER (PARTITION BY c.id ORDER BY t.line))::text, 10, '0'),"
+            f'  COALESCE(t.created_at, NOW()), NOW(), 1'
+            f' FROM import_tasks t'
+            f' JOIN import_columns c ON c.project_source_id = t.project_source_id AND c.source_id = t.column_source_id'
+            f' JOIN import_projects p ON p.source_id = t.project_source_id',
+            [self.user.id]
+        )
+
+
+def open_text(file):
+    """Wrap an uploaded or opened binary file for line-by-line text reading."""
+    return io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
@@ -0,0 +1,80 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = [
+    '/api/tasks/bootstrap/',
+    '/api/tasks/project/',
+    '/api/tasks/all-task/?time=2000-01-01 00:00:00',
+    '/api/tasks/overdue-tasks/',
+    '/api/tasks/on-deadline-tasks/',
+    '/api/tasks/tasks-by-month/?month=1&year=2025',
+    '/api/reports/get-all-weakly/',
+    '/api/reports/get-all-monthly/',
+]
+
+
+class Command(BaseCommand):
+    help = ("Hammer the read endpoints of a running server with concurrent clients and report requests per second. "
+            "Run it once against the WSGI deployment and once against the ASGI one (see README).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="Base URL of the server under test.")
+        parser.add_argument('--token', required=True, help="JWT access token of the user whose data is read.")
+        parser.add_argument('--path', action='append', dest='paths',
+                            help="Path to request, repeatable; defaults to the project, calendar and report lists. "
+                                 "Add /api/tasks/task/get/<project id>/ to include a board.")
+        parser.add_argument('--concurrency', type=int, default=200, help="Number of concurrent clients.")
+        parser.add_argument('--duration', type=float, default=30, help="Seconds to run for.")
+        parser.add_argument('--no-cache', action='store_true',
+                            help="Send a unique query parameter per request so the response cache never hits.")
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['duration'] <= 0:
+            raise CommandError("--concurrency and --duration must be positive.")
+
+        paths = options['paths'] or DEFAULT_PATHS
+        headers = {'Authorization': f"Bearer {options['token']}", 'Accept': 'application/json'}
+        deadline = time.monotonic() + options['duration']
+        lock = threading.Lock()
+        latencies = []
+        errors = []
+
+        def client(index):
+            session = requests.Session()
+            session.headers.update(headers)
+            sent = 0
+            while time.monotonic() < deadline:
+                path = paths[(index + sent) % len(paths)]
+                if options['no_cache']:
+                    path += f"{'&' if '?' in path else '?'}bench={index}-{sent}"
+                sent += 1
+                started = time.monotonic()
+                try:
+                    response = session.get(options['url'].rstrip('/') + path, timeout=60)
+                    failed = response.status_code != 200
+                except requests.RequestException:
+                    failed = True
+                elapsed = time.monotonic() - started
+                with lock:
+                    (errors if failed else latencies).append(elapsed)
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            list(executor.map(client, range(options['concurrency'])))
+        elapsed = time.monotonic() - started
+
+        if not latencies:
+            raise CommandError(f"All {len(errors)} requests failed.")
+
+        latencies.sort()
+        percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+        self.stdout.write(f"clients:       {options['concurrency']}")
+        self.stdout.write(f"requests:      {len(latencies)} ok, {len(errors)} failed")
+        self.stdout.write(self.style.SUCCESS(f"requests/sec:  {len(latencies) / elapsed:.1f}"))
+        self.stdout.write(f"latency (ms):  p50 {percentile(0.5):.1f}  p95 {percentile(0.95):.1f}  "
+                          f"p99 {percentile(0.99):.1f}  mean {statistics.mean(latencies) * 1000:.1f}")
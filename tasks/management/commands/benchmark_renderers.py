@@ -0,0 +1,100 @@
+import statistics
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from tasks.renderers import MessagePackRenderer, ORJSONRenderer
+
+RENDERERS = [
+    ('JSONRenderer (DRF)', JSONRenderer),
+    ('ORJSONRenderer', ORJSONRenderer),
+    ('MessagePackRenderer', MessagePackRenderer),
+]
+
+
+class Command(BaseCommand):
+    help = ("Time rendering a board-sized APIResponse payload with DRF's JSONRenderer, ORJSONRenderer and "
+            "MessagePackRenderer. The payload is built in memory with native UUIDs, datetimes, Decimals and "
+            "numpy floats; no database is needed.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--columns', type=int, default=5, help="Columns on the board.")
+        parser.add_argument('--tasks-per-column', type=int, default=200, help="Tasks in each column.")
+        parser.add_argument('--repeat', type=int, default=200, help="Renders per renderer.")
+
+    def handle(self, *args, **options):
+        if options['columns'] < 1 or options['tasks_per_column'] < 0 or options['repeat'] < 1:
+            raise CommandError("--columns and --repeat must be positive, --tasks-per-column not negative.")
+
+        data = self.build_board(options['columns'], options['tasks_per_column'])
+        self.stdout.write(f"board:  {options['columns']} columns x {options['tasks_per_column']} tasks, "
+                          f"{options['repeat']} renders")
+
+        baseline = None
+        for name, renderer_class in RENDERERS:
+            renderer = renderer_class()
+            durations = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                body = renderer.render(data, renderer_class.media_type, {})
+                durations.append(time.perf_counter() - started)
+            median = statistics.median(durations) * 1000
+            baseline = baseline or median
+            self.stdout.write(self.style.SUCCESS(
+                f"{name:<22}{median:8.2f} ms  {len(body) / 1024:8.1f} KiB  {baseline / median:5.1f}x"
+            ))
+
+    def build_board(self, column_count, tasks_per_column):
+        """An APIResponse envelope shaped like TaskListView's board."""
+        now = timezone.now()
+        project_id = uuid.uuid4()
+        columns = []
+        for order in range(column_count):
+            column_id = uuid.uuid4()
+            tasks = [{
+                'id': uuid.uuid4(),
+                'title': f'Task {index}',
+                'content': 'Content ' * 10,
+                'deadline': now + timedelta(hours=index),
+                'priority': 2,
+                'status': 1,
+                'finish_at': None,
+                'project': project_id,
+                'column': column_id,
+                'rank': f'i{index}',
+                'created_at': now,
+                'updated_at': now,
+                'revision': index,
+                # Report payloads carry Decimals and numpy floats.
+                'estimate': Decimal('1.50'),
+                'score': np.float64(index / 3),
+            } for index in range(tasks_per_column)]
+            columns.append({
+                'column': {
+                    'id': column_id,
+                    'name': f'Column {order}',
+                    'order': order,
+                    'rank': f'i{order}',
+                    'is_done_column': False,
+                    'task_count': tasks_per_column,
+                    'doing_count': tasks_per_column,
+                    'done_count': 0,
+                    'overdue_count': 0,
+                },
+                'tasks': tasks,
+            })
+
+        return {
+            'status': 200,
+            'message': 'Success',
+            'data': {
+                'project': {'id': project_id, 'name': 'Benchmark', 'created_at': now, 'updated_at': now},
+                'columns': columns,
+            },
+        }
@@ -0,0 +1,72 @@
+import json
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from tasks.models import Project, TableColumn, Task
+from tasks.serializers import GetAllTaskSerializer, TaskRowSerializer
+
+
+class Command(BaseCommand):
+    help = ("Time serializing one page of the all-task, overdue and on-deadline listings with GetAllTaskSerializer "
+            "and with the TaskRowSerializer fast path. Rows are built in memory; no database is needed, so the "
+            "per-row project query GetAllTaskSerializer used to cost is not counted.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100, help="Tasks per page.")
+        parser.add_argument('--pages', type=int, default=500, help="Pages to serialize with each serializer.")
+
+    def handle(self, *args, **options):
+        if options['page_size'] < 1 or options['pages'] < 1:
+            raise CommandError("--page-size and --pages must be positive.")
+
+        tasks = self.build_tasks(options['page_size'])
+        rows = [self.to_row(task) for task in tasks]
+        # Compared as clients see them: GetAllTaskSerializer leaves project and column as UUIDs.
+        render = lambda data: json.loads(JSONRenderer().render(data))
+        if render(TaskRowSerializer(rows).data) != render(GetAllTaskSerializer(tasks, many=True).data):
+            raise CommandError("TaskRowSerializer and GetAllTaskSerializer disagree.")
+
+        before = self.time(lambda: GetAllTaskSerializer(tasks, many=True).data, options['pages'])
+        after = self.time(lambda: TaskRowSerializer(rows).data, options['pages'])
+
+        self.stdout.write(f"page size:             {options['page_size']} tasks, {options['pages']} pages")
+        self.stdout.write(f"GetAllTaskSerializer:  {before:.2f} ms/page")
+        self.stdout.write(f"TaskRowSerializer:     {after:.2f} ms/page")
+        self.stdout.write(self.style.SUCCESS(f"speedup:               {before / after:.1f}x"))
+
+    def time(self, serialize, pages):
+        durations = []
+        for _ in range(pages):
+            started = time.perf_counter()
+            serialize()
+            durations.append(time.perf_counter() - started)
+        return statistics.median(durations) * 1000
+
+    def build_tasks(self, count):
+        now = timezone.now()
+        project = Project(id=uuid.uuid4(), name='Benchmark')
+        columns = [TableColumn(id=uuid.uuid4(), name=name, order=order, project=project)
+                   for order, name in enumerate(['To do', 'Doing', 'Done'])]
+        tasks = []
+        for index in range(count):
+            status = [Task.DOING, Task.DONE, Task.OVERDUE][index % 3]
+            tasks.append(Task(
+                id=uuid.uuid4(), title=f'Task {index}', content='Content' if index % 2 else None,
+                deadline=now + timedelta(hours=index), priority=Task.MEDIUM, status=status,
+                finish_at=now if status == Task.DONE else None, project=project, column=columns[index % 3],
+                rank=f'i{index}', created_at=now, updated_at=now, revision=index,
+            ))
+        return tasks
+
+    def to_row(self, task):
+        """The ``.values()`` row the listing views read for ``task``."""
+        row = {field: getattr(task, f'{field}_id' if field in ('project', 'column') else field)
+               for field in TaskRowSerializer.fields}
+        row['project_name'] = task.project.name
+        return row
@@ -0,0 +1,157 @@
+import json
+import random
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from tasks.models import Project, TableColumn, Task
+from tasks.views import AllTaskListView, OverdueTasksListView, OnDeadlineTasksListView, TaskListView
+
+CHECKED_TABLES = {Task._meta.db_table}
+SEED_BATCH_SIZE = 5000
+# Queries that read every user's tasks; all others must prune to one partition.
+CROSS_USER_QUERIES = {'deadline_notifications', 'overdue_notifications'}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("EXPLAIN the hot task, calendar, report and notification queries and fail on sequential scans of tasks, "
+            "or, once tasks is partitioned, on per-user queries that read more than one partition.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Email of the user whose data is explained.")
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Seed this many tasks for a throwaway user; everything is rolled back.")
+        parser.add_argument('--analyze', action='store_true',
+                            help="Run the queries (EXPLAIN ANALYZE) and report their execution times.")
+
+    def handle(self, *args, **options):
+        if not options['user'] and not options['seed']:
+            raise CommandError("Pass --user or --seed.")
+
+        failures = []
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    user = self.seed(options['seed'])
+                else:
+                    try:
+                        user = CustomUser.objects.get(email=options['user'])
+                    except CustomUser.DoesNotExist:
+                        raise CommandError("User not found.")
+
+                partitions = self.get_partitions()
+                for name, queryset in self.get_querysets(user):
+                    plan = json.loads(queryset.explain(format='json', analyze=options['analyze']))
+                    nodes = list(self.walk(plan[0]['Plan']))
+                    scans = [node for node in nodes
+                             if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in CHECKED_TABLES]
+                    scanned_partitions = {node['Relation Name'] for node in nodes
+                                          if node.get('Relation Name') in partitions}
+                    timing = f" in {plan[0]['Execution Time']:.1f} ms" if options['analyze'] else ''
+                    if scans:
+                        failures.append(name)
+                        self.stdout.write(self.style.ERROR(f"{name}: Seq Scan on {scans[0]['Relation Name']}{timing}"))
+                    elif len(scanned_partitions) > 1 and name not in CROSS_USER_QUERIES:
+                        failures.append(name)
+                        self.stdout.write(self.style.ERROR(
+                            f"{name}: reads {len(scanned_partitions)} partitions of {Task._meta.db_table}{timing}"
+                        ))
+                    else:
+                        self.stdout.write(self.style.SUCCESS(f"{name}: OK{timing}"))
+
+                if options['seed']:
+                    raise Rollback
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"Unexpected plans in: {', '.join(failures)}")
+
+    @staticmethod
+    def get_partitions():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = %s::regclass",
+                [Task._meta.db_table]
+            )
+            partitions = {name for name, in cursor.fetchall()}
+        # A sequential scan of any partition counts as one of tasks.
+        CHECKED_TABLES.update(partitions)
+        return partitions
+
+    def walk(self, node):
+        yield node
+        for child in node.get('Plans', []):
+            yield from self.walk(child)
+
+    def get_querysets(self, user):
+        now = timezone.now()
+        start_of_day = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+        end_of_day = start_of_day + timedelta(days=1)
+        request = SimpleNamespace(user=user, GET={})
+        project = Project.objects.filter(user=user).first()
+
+        if project is not None:
+            view = TaskListView(request=request, kwargs={'project_id': project.id})
+            yield 'board', view.get_board_tasks(project, list(TableColumn.objects.filter(project=project)))
+        yield 'all_tasks', AllTaskListView(request=request).get_queryset(now)
+        yield 'overdue_tasks', OverdueTasksListView(request=request).get_queryset(now)
+        yield 'on_deadline_tasks', OnDeadlineTasksListView(request=request).get_queryset(now)
+        yield 'tasks_by_month', Task.objects.filter(
+            Q(status=1, deadline__gte=start_of_day) | Q(status=3, deadline__lt=end_of_day),
+            user=user,
+        )
+        yield 'report_created', Task.objects.filter(
+            created_at__gte=start_of_day - timedelta(days=7), created_at__lt=start_of_day, user=user)
+        yield 'report_finished', Task.objects.filter(
+            finish_at__gte=start_of_day - timedelta(days=7), finish_at__lt=start_of_day, user=user)
+        yield 'report_analyze', Task.objects.filter(
+            finish_at__gte=start_of_day - timedelta(days=7), finish_at__lt=start_of_day,
+            user=user, status=Task.DONE)
+        yield 'deadline_notifications', Task.objects.filter(deadline__gte=now, status=Task.DOING)
+        yield 'overdue_notifications', Task.objects.filter(deadline__lte=now, status=Task.DOING)
+
+    def seed(self, count):
+        now = timezone.now()
+        owner = CustomUser.objects.create_user(email='query-plans@example.com', first_name='Query', last_name='Plans')
+        others = [
+            CustomUser.objects.create_user(email=f'query-plans-{i}@example.com', first_name='Query', last_name='Plans')
+            for i in range(9)
+        ]
+
+        for user in [owner] + others:
+            project = Project.objects.create(name='Query plans', user=user)
+            columns = TableColumn.objects.bulk_create([
+                TableColumn(name=name, order=order, is_done_column=order == 2, project=project)
+                for order, name in enumerate(['To do', 'Doing', 'Done'])
+            ])
+            # Written in batches so seeding 10M+ tasks does not hold them all in memory.
+            remaining = count // 10
+            while remaining > 0:
+                tasks = []
+                for _ in range(min(remaining, SEED_BATCH_SIZE)):
+                    column = random.choice(columns)
+                    deadline = now + timedelta(hours=random.randint(-24 * 90, 24 * 90))
+                    status = Task.DONE if column.is_done_column else (Task.OVERDUE if deadline < now else Task.DOING)
+                    tasks.append(Task(
+                        title='Task', deadline=deadline, priority=random.choice([Task.LOW, Task.MEDIUM, Task.HIGH]),
+                        status=status, finish_at=deadline if status == Task.DONE else None,
+                        project=project, column=column, user=user,
+                    ))
+                Task.objects.bulk_create(tasks)
+                remaining -= len(tasks)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Task._meta.db_table}')
+            cursor.execute(f'ANALYZE {Project._meta.db_table}')
+
+        return owner
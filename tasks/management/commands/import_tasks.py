@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import CustomUser
+from tasks.importer import TaskImporter, TaskImportError, open_text
+
+
+class Command(BaseCommand):
+    help = "Import projects, columns and tasks from an NDJSON or CSV export with PostgreSQL COPY."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import.")
+        parser.add_argument('--user', required=True, help="Email of the user who will own the imported projects.")
+        parser.add_argument('--type', choices=['ndjson', 'csv'], default=None,
+                            help="Input format; guessed from the file extension by default.")
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(email=options['user'])
+        except CustomUser.DoesNotExist:
+            raise CommandError("User not found.")
+
+        import_type = options['type'] or ('csv' if options['path'].endswith('.csv') else 'ndjson')
+        importer = TaskImporter(user, import_type)
+        try:
+            with open(options['path'], 'rb') as file:
+                counts = importer.run(open_text(file))
+        except OSError as e:
+            raise CommandError(str(e))
+        except TaskImportError as e:
+            for error in e.errors:
+                self.stderr.write(f"line {error['line']}: {error['errors']}")
+            raise CommandError("Nothing was imported.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {counts['project']} projects, {counts['column']} columns and {counts['task']} tasks."
+        ))
@@ -0,0 +1,141 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from notifications.models import Notification
+from tasks.archive import create_archive
+from tasks.counters import create_counter_triggers
+from tasks.models import Project, Task, TaskWithArchive
+
+# Table -> partition key. Tasks are split by owner so every per-user query
+# reads one partition; notifications are only ever looked up by task.
+PARTITION_KEYS = {
+    Task._meta.db_table: 'user_id',
+    Notification._meta.db_table: 'task_id',
+}
+
+
+class Command(BaseCommand):
+    help = ("Convert tasks and notifications to hash-partitioned tables, copying the existing rows. "
+            "Takes an exclusive lock on each table for the duration of the copy; run it in a maintenance window.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--partitions', type=int, default=16, help="Number of hash partitions per table.")
+        parser.add_argument('--keep-old', action='store_true',
+                            help="Keep the original tables as <table>_unpartitioned instead of dropping them.")
+
+    def handle(self, *args, **options):
+        if options['partitions'] < 2:
+            raise CommandError("--partitions must be at least 2.")
+
+        # Tasks first: converting it drops the notifications -> tasks foreign key.
+        for table, key in PARTITION_KEYS.items():
+            if self.is_partitioned(table):
+                self.stdout.write(f"{table}: already partitioned")
+                continue
+            with transaction.atomic():
+                rows = self.partition(table, key, options['partitions'], options['keep_old'])
+            self.stdout.write(self.style.SUCCESS(
+                f"{table}: {rows} rows copied into {options['partitions']} partitions by {key}"
+            ))
+
+    @staticmethod
+    def is_partitioned(table):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+            row = cursor.fetchone()
+        if row is None:
+            raise CommandError(f"Table {table} does not exist; run migrate first.")
+        return row[0] == 'p'
+
+    def partition(self, table, key, partitions, keep_old):
+        old = f'{table}_unpartitioned'
+        qn = connection.ops.quote_name
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {qn(table)} IN ACCESS EXCLUSIVE MODE')
+            if table == Task._meta.db_table:
+                # The view would follow the renamed table and block dropping it; rebuilt below.
+                cursor.execute(f'DROP VIEW IF EXISTS {qn(TaskWithArchive._meta.db_table)}')
+                # Rows written before Task.user existed and not yet backfilled by migrate.
+                cursor.execute(
+                    f'UPDATE {qn(table)} SET user_id = project.user_id FROM {qn(Project._meta.db_table)} project'
+                    f' WHERE {qn(table)}.project_id = project.id AND {qn(table)}.user_id IS NULL'
+                )
+
+            # A partitioned table cannot back a foreign key on id alone; the
+            # models reference it with db_constraint=False.
+            cursor.execute(
+                "SELECT conrelid::regclass::text, conname FROM pg_constraint"
+                " WHERE contype = 'f' AND confrelid = %s::regclass AND conrelid <> confrelid",
+                [table]
+            )
+            for referencing_table, name in cursor.fetchall():
+                cursor.execute(f'ALTER TABLE {referencing_table} DROP CONSTRAINT {qn(name)}')
+
+            cursor.execute(
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint"
+                " WHERE conrelid = %s::regclass AND contype IN ('f', 'c')",
+                [table]
+            )
+            constraints = cursor.fetchall()
+            cursor.execute(
+                "SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i"
+                " JOIN pg_class c ON c.oid = i.indexrelid WHERE i.indrelid = %s::regclass AND NOT i.indisprimary",
+                [table]
+            )
+            indexes = cursor.fetchall()
+            cursor.execute(
+                "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'", [table]
+            )
+            primary_key = cursor.fetchone()[0]
+            cursor.execute(
+                "SELECT column_name FROM information_schema.columns"
+                " WHERE table_schema = current_schema() AND table_name = %s AND is_generated = 'NEVER'"
+                " ORDER BY ordinal_position",
+                [table]
+            )
+            columns = ', '.join(qn(column) for column, in cursor.fetchall())
+
+            # Free every name for the new table; Django migrations refer to indexes and constraints by name.
+            cursor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(old)}')
+            cursor.execute(
+                "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass", [old]
+            )
+            for name, in cursor.fetchall():
+                cursor.execute(f'ALTER TABLE {qn(old)} RENAME CONSTRAINT {qn(name)} TO {qn(self.old_name(name))}')
+            for name, _ in indexes:
+                cursor.execute(f'ALTER INDEX {qn(name)} RENAME TO {qn(self.old_name(name))}')
+
+            cursor.execute(
+                f'CREATE TABLE {qn(table)} (LIKE {qn(old)} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE)'
+                f' PARTITION BY HASH ({qn(key)})'
+            )
+            # The partition key must be part of the primary key; id stays first for lookups by id.
+            cursor.execute(f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(primary_key)} PRIMARY KEY (id, {qn(key)})')
+            for remainder in range(partitions):
+                cursor.execute(
+                    f'CREATE TABLE {qn(f"{table}_p{remainder}")} PARTITION OF {qn(table)}'
+                    f' FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})'
+                )
+
+            cursor.execute(f'INSERT INTO {qn(table)} ({columns}) SELECT {columns} FROM {qn(old)}')
+            rows = cursor.rowcount
+
+            # Indexes are built after the copy, on every partition at once.
+            for _, definition in indexes:
+                cursor.execute(definition)
+            for name, definition in constraints:
+                cursor.execute(f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}')
+
+            if table == Task._meta.db_table:
+                create_archive(cursor)
+                create_counter_triggers(cursor)
+            if not keep_old:
+                cursor.execute(f'DROP TABLE {qn(old)}')
+            cursor.execute(f'ANALYZE {qn(table)}')
+
+        return rows
+
+    @staticmethod
+    def old_name(name):
+        return f'{name[:59]}_old'
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from tasks.counters import reconcile_counters
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = ("Recount the task counters of every project and column from the tasks table and fix the ones that "
+            "drifted. Blocks task writes while it runs; run it once after the counters are added, then as needed.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Writes committed mid-recount would be lost from the counters.
+            cursor.execute(f'LOCK TABLE {connection.ops.quote_name(Task._meta.db_table)} IN SHARE MODE')
+            corrected = reconcile_counters(cursor)
+
+        for model_name, rows in corrected.items():
+            style = self.style.WARNING if rows else self.style.SUCCESS
+            self.stdout.write(style(f"{model_name}: {rows} rows corrected"))
@@ -1,18 +1,72 @@
 import uuid
-from django.db import models
-from django.db.models import ExpressionWrapper, F, DurationField, Case, Value, When, IntegerField, Func
+from collections import defaultdict
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField, SearchQuery, SearchRank, SearchHeadline
+from django.db import models, connection, transaction
+from django.db.models import F, Case, Value, When, IntegerField, Q, Max
+from django.db.models.functions import Cast
 from django.utils import timezone
 
 from accounts.models import CustomUser
+from tasks.events import publish_on_commit
+from tasks.utils import rank_between, ranks_between, bump_user_cache_version
+
+
+class ProjectManager(models.Manager):
+    def get_queryset(self):
+        # Projects being purged by tasks.deletion are gone as far as the API is concerned.
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class TaskManager(models.Manager):
+    def get_queryset(self):
+        # Hidden with their project at once, not batch by batch as they are purged.
+        return super().get_queryset().exclude(
+            project_id__in=Project.all_objects.filter(deleted_at__isnull=False).values('id')
+        )
+
+
+class TaskCountersMixin:
+    """For models with task counters; the database triggers own those columns."""
+    task_counter_fields = ['task_count', 'doing_count', 'done_count', 'overdue_count']
+    # Advanced by statements of their own (see Project.next_revision), never by a model save.
+    statement_fields = ['revision']
+
+    def save(self, *args, **kwargs):
+        # Writing back the loaded values would undo the updates committed since by the
+        # triggers or by concurrent writes; a revision going back hides changes from sync.
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            skipped = self.task_counter_fields + self.statement_fields
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name not in skipped]
+        super().save(*args, **kwargs)
 
 
 # Create your models here.
-class Project(models.Model):
+class Project(TaskCountersMixin, models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255, null=False, blank=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, editable=False)
+    # Advanced on every write to the project, its columns or its tasks.
+    revision = models.BigIntegerField(default=0, editable=False)
+    # Tombstones up to this revision have been pruned; older cursors must resync.
+    pruned_revision = models.BigIntegerField(default=0, editable=False)
+    # Set when the owner deletes the project; its rows are purged in the background.
+    deleted_at = models.DateTimeField(null=True, editable=False)
+    # Kept by database triggers, see tasks.counters.
+    task_count = models.IntegerField(default=0, db_default=0, editable=False)
+    doing_count = models.IntegerField(default=0, db_default=0, editable=False)
+    done_count = models.IntegerField(default=0, db_default=0, editable=False)
+    overdue_count = models.IntegerField(default=0, db_default=0, editable=False)
+
+    objects = ProjectManager()
+    all_objects = models.Manager()
+
+    # deleted_at too: a rename racing a delete must not bring the project back.
+    statement_fields = ['revision', 'pruned_revision', 'deleted_at']
 
     def __str__(self):
         return self.name
@@ -20,26 +74,138 @@ class Project(models.Model):
     class Meta:
         db_table = 'tasks_projects'
         ordering = ['-created_at', 'name']
+        indexes = [
+            models.Index(fields=['deleted_at'], condition=Q(deleted_at__isnull=False), name='tasks_projects_deleted'),
+        ]
+
+    @staticmethod
+    def next_revision(project_id):
+        """Advance the project's revision; the row stays locked until commit."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {Project._meta.db_table} SET revision = revision + 1 WHERE id = %s RETURNING revision',
+                [project_id]
+            )
+            row = cursor.fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def stamp_revisions(objects):
+        """Give objects written in bulk the next revision of their project.
 
+        Must run inside the transaction that writes the objects.
+        """
+        objects_by_project = defaultdict(list)
+        for obj in objects:
+            objects_by_project[obj.project_id].append(obj)
+        for project_id, project_objects in objects_by_project.items():
+            revision = Project.next_revision(project_id)
+            for obj in project_objects:
+                obj.revision = revision
+            # Too many rows to describe; subscribers fetch the delta from the sync endpoint.
+            publish_on_commit(project_id, {
+                'model': 'project', 'action': 'changed', 'id': str(project_id), 'revision': revision
+            })
 
-class TableColumn(models.Model):
+    @staticmethod
+    def stamp_revision(obj):
+        """Advance the project's revision and store it on ``obj`` in one statement."""
+        where, params = f'{obj._meta.db_table}.id = %s', [obj.project_id, obj.pk]
+        if isinstance(obj, Task):
+            # The owner is the partition key; without it every partition is searched.
+            where += f' AND {obj._meta.db_table}.user_id = %s'
+            params.append(obj.user_id)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'WITH project AS ('
+                f'  UPDATE {Project._meta.db_table} SET revision = revision + 1 WHERE id = %s RETURNING revision'
+                f') UPDATE {obj._meta.db_table} SET revision = project.revision FROM project'
+                f' WHERE {where} RETURNING project.revision',
+                params
+            )
+            row = cursor.fetchone()
+        if row:
+            obj.revision = row[0]
+
+    @staticmethod
+    def bury(obj, model):
+        """Record the deletion of ``obj`` for delta sync; returns the new revision."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'WITH project AS ('
+                f'  UPDATE {Project._meta.db_table} SET revision = revision + 1 WHERE id = %s RETURNING revision'
+                f') INSERT INTO {Tombstone._meta.db_table} (id, project_id, model, object_id, revision, created_at)'
+                f' SELECT %s, %s, %s, %s, project.revision, NOW() FROM project RETURNING revision',
+                [obj.project_id, uuid.uuid4(), obj.project_id, model, obj.pk]
+            )
+            row = cursor.fetchone()
+        return row[0] if row else 0
+
+
+class TableColumn(TaskCountersMixin, models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255, null=False, blank=False)
     order = models.IntegerField(null=False, blank=False)
+    rank = models.CharField(max_length=255, default='', db_collation='C', editable=False)
     is_done_column = models.BooleanField(default=False)
     project = models.ForeignKey(Project, on_delete=models.CASCADE, editable=False, related_name='columns')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    revision = models.BigIntegerField(default=0, editable=False)
+    # Kept by database triggers, see tasks.counters.
+    task_count = models.IntegerField(default=0, db_default=0, editable=False)
+    doing_count = models.IntegerField(default=0, db_default=0, editable=False)
+    done_count = models.IntegerField(default=0, db_default=0, editable=False)
+    overdue_count = models.IntegerField(default=0, db_default=0, editable=False)
 
     def __str__(self):
         return self.name
 
     class Meta:
         db_table = 'tasks_table_columns'
-        ordering = ['order', 'name']
+        ordering = ['rank', 'order', 'name']
+        indexes = [
+            models.Index(fields=['project', 'rank'], name='tasks_table_columns_rank'),
+            models.Index(fields=['project', 'revision'], name='tasks_table_columns_revision'),
+        ]
+
+    @staticmethod
+    def next_ranks(project_id, count=1):
+        last = TableColumn.objects.filter(project_id=project_id).aggregate(last=Max('rank'))['last']
+        return ranks_between(last, None, count)
+
+    @staticmethod
+    def rebalance(project_id):
+        # Columns created before ranks existed have rank '' and keep their order.
+        with transaction.atomic():
+            # The project before its columns, as the counter triggers lock them.
+            user_id = Project.objects.filter(id=project_id).select_for_update().values_list(
+                'user_id', flat=True
+            ).first()
+            columns = list(
+                TableColumn.objects.filter(project_id=project_id).select_for_update().order_by('rank', 'order', 'name')
+            )
+            for column, rank in zip(columns, ranks_between('', None, len(columns))):
+                column.rank = rank
+            Project.stamp_revisions(columns)
+            TableColumn.objects.bulk_update(columns, ['rank', 'revision'])
+            transaction.on_commit(lambda: bump_user_cache_version(user_id))
+        return columns
 
+    @staticmethod
+    def rank_for_order(column):
+        """Rank placing ``column`` where its legacy ``order`` puts it."""
+        siblings = TableColumn.objects.filter(project_id=column.project_id).exclude(id=column.id)
+        if siblings.filter(rank='').exists():
+            TableColumn.rebalance(column.project_id)
+
+        before = siblings.filter(order__lt=column.order).aggregate(rank=Max('rank'))['rank']
+        after = siblings.filter(order__gte=column.order).exclude(rank__lte=before or '').order_by('rank').first()
+        return rank_between(before, after.rank if after else None)
 
-class Task(models.Model):
+
+class AbstractTask(models.Model):
+    """Columns shared by live tasks, archived tasks and the view over both."""
     LOW = 1
     MEDIUM = 2
     HIGH = 3
@@ -66,36 +232,202 @@ class Task(models.Model):
     finish_at = models.DateTimeField(null=True, blank=True)
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
     column = models.ForeignKey(TableColumn, on_delete=models.CASCADE)
+    # The project's owner, copied on save: per-user queries filter on it without
+    # joining projects, and it is the partition key of tasks (see partition_tables).
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, editable=False, related_name='+', db_index=False)
+    rank = models.CharField(max_length=255, default='', db_collation='C', editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    revision = models.BigIntegerField(default=0, editable=False)
+    sort_rank = models.GeneratedField(
+        expression=Case(
+            When(status=OVERDUE, then=Value(0)),
+            When(status=DOING, then=Value(1)),
+            default=Value(2),
+        ),
+        output_field=IntegerField(),
+        db_persist=True,
+    )
+    sort_deadline = models.GeneratedField(
+        expression=Case(
+            When(status=DOING, then=F('deadline')),
+            default=Value(None),
+        ),
+        output_field=models.DateTimeField(null=True),
+        db_persist=True,
+    )
+    search_vector = models.GeneratedField(
+        expression=(SearchVector('title', weight='A', config='simple')
+                    + SearchVector('content', weight='B', config='simple')),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     def __str__(self):
         return self.title
 
+    class Meta:
+        abstract = True
+
+
+class Task(AbstractTask):
+    objects = TaskManager()
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # The owner is the partition key; without it every partition is searched.
+        return super()._do_update(base_qs.filter(user_id=self.user_id), using, pk_val, values, update_fields,
+                                  forced_update)
+
     class Meta:
         db_table = 'tasks'
+        indexes = [
+            # Listings and the calendar: user + status + deadline range; id last for
+            # the (deadline, id) cursor of TaskPagination.
+            models.Index(fields=['user', 'status', 'deadline', 'id'], name='tasks_user_status_deadline'),
+            # Deadline and overdue notification jobs scan DOING tasks by deadline.
+            models.Index(fields=['deadline'], condition=Q(status=1), name='tasks_doing_deadline'),
+            # Reports filter by finish_at ranges, with or without status=DONE.
+            models.Index(fields=['user', 'finish_at'], condition=Q(finish_at__isnull=False),
+                         name='tasks_user_finish_at'),
+            models.Index(fields=['user', 'created_at'], name='tasks_user_created_at'),
+            # Archiving picks the oldest finished tasks, see tasks.archive.
+            models.Index(fields=['finish_at'], condition=Q(status=2), name='tasks_done_finish_at'),
+            # Board ordering, see order_by_status_and_time.
+            models.Index(fields=['project', 'sort_rank', '-sort_deadline', '-priority'], name='tasks_project_sort'),
+            # Manual order inside a column, see order_by_rank.
+            models.Index(fields=['column', 'rank'], name='tasks_column_rank'),
+            models.Index(fields=['project', 'revision'], name='tasks_project_revision'),
+            GinIndex(fields=['search_vector'], name='tasks_search_vector'),
+        ]
 
     @staticmethod
     def order_by_status_and_time():
-        return Task.objects.annotate(
-            remaining_time=Func(
-                F('deadline'),
-                function='AGE',
-                output_field=DurationField()
-            )
-        ).order_by(
-            Case(
-                When(status=Task.OVERDUE, then=Value(0)),
-                default=Value(1),
-                output_field=IntegerField()
-            ),
-            Case(
-                When(status=Task.DOING, then=F('remaining_time')),
-                default=Value(None),
-                output_field=DurationField()
-            ),
-            '-priority',
-            'column__order'
+        # Overdue first, then doing by deadline, then done; served by the
+        # stored sort_rank/sort_deadline columns and tasks_project_sort.
+        return Task.objects.order_by('sort_rank', '-sort_deadline', '-priority', 'column__order')
+
+    @staticmethod
+    def search(query, queryset=None):
+        """Match ``query`` against live tasks, or against ``queryset`` of any AbstractTask model."""
+        queryset = Task.objects.all() if queryset is None else queryset
+        search_query = SearchQuery(query, config='simple', search_type='websearch')
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=Cast(SearchRank(F('search_vector'), search_query), models.FloatField()),
+            title_highlight=SearchHeadline('title', search_query, config='simple',
+                                           start_sel='<mark>', stop_sel='</mark>', highlight_all=True),
+            content_highlight=SearchHeadline('content', search_query, config='simple',
+                                             start_sel='<mark>', stop_sel='</mark>', max_fragments=3),
         )
 
+    @staticmethod
+    def order_by_rank():
+        # Tasks created before ranks existed have rank '' and come first.
+        return Task.objects.order_by('rank', 'sort_rank', '-sort_deadline', '-priority')
+
+    @staticmethod
+    def next_ranks(column_id, count=1):
+        last = Task.objects.filter(column_id=column_id).aggregate(last=Max('rank'))['last']
+        return ranks_between(last, None, count)
+
+    @staticmethod
+    def mark_overdue(now):
+        """Flip DOING tasks past their deadline to OVERDUE; returns the ids of exactly the tasks flipped.
+
+        Locks in the order of every task write: the tasks first, then their
+        projects (the counter triggers and the revision stamp). Tasks locked
+        by a concurrent edit are skipped and picked up by the next run.
+        """
+        tasks, projects = Task._meta.db_table, Project._meta.db_table
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'SELECT id, project_id, user_id FROM {tasks} WHERE status = %s AND deadline <= %s'
+                    f' AND project_id NOT IN (SELECT id FROM {projects} WHERE deleted_at IS NOT NULL)'
+                    f' FOR UPDATE SKIP LOCKED',
+                    [Task.DOING, now]
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    return []
+                cursor.execute(
+                    f'UPDATE {projects} SET revision = revision + 1 WHERE id = ANY(%s::uuid[]) RETURNING id, revision',
+                    [list({project_id for _, project_id, _ in rows})]
+                )
+                revisions = dict(cursor.fetchall())
+                cursor.execute(
+                    f'UPDATE {tasks} SET status = %s, updated_at = %s, revision = claimed.revision'
+                    f' FROM unnest(%s::uuid[], %s::uuid[], %s::bigint[]) AS claimed (id, user_id, revision)'
+                    f' WHERE {tasks}.id = claimed.id AND {tasks}.user_id = claimed.user_id',
+                    [Task.OVERDUE, now, [task_id for task_id, _, _ in rows], [user_id for _, _, user_id in rows],
+                     [revisions[project_id] for _, project_id, _ in rows]]
+                )
+
+            for project_id, revision in revisions.items():
+                publish_on_commit(project_id, {
+                    'model': 'project', 'action': 'changed', 'id': str(project_id), 'revision': revision
+                })
+            for user_id in {user_id for _, _, user_id in rows}:
+                transaction.on_commit(lambda user_id=user_id: bump_user_cache_version(user_id))
+        return [task_id for task_id, _, _ in rows]
+
+    @staticmethod
+    def rebalance(column_id):
+        with transaction.atomic():
+            tasks = list(Task.order_by_rank().filter(column_id=column_id).select_for_update(of=('self',)))
+            for task, rank in zip(tasks, ranks_between('', None, len(tasks))):
+                task.rank = rank
+            Project.stamp_revisions(tasks)
+            Task.objects.bulk_update(tasks, ['rank', 'revision'])
+            user_id = TableColumn.objects.filter(id=column_id).values_list('project__user_id', flat=True).first()
+            transaction.on_commit(lambda: bump_user_cache_version(user_id))
+        return tasks
 
+
+class ArchivedTask(AbstractTask):
+    """Finished tasks moved off the boards by tasks.archive.archive_done_tasks.
+
+    The table is range-partitioned by month of ``finish_at`` and created
+    by tasks.archive.create_archive, not by migrations. Deletes cascade
+    through the ORM only.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, db_constraint=False, related_name='+')
+    column = models.ForeignKey(TableColumn, on_delete=models.CASCADE, db_constraint=False, related_name='+')
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, null=True, db_constraint=False, editable=False,
+                             related_name='+')
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = 'tasks_archive'
+
+
+class TaskWithArchive(AbstractTask):
+    """Read-only view of live and archived tasks, for reports and search."""
+    project = models.ForeignKey(Project, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    column = models.ForeignKey(TableColumn, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    user = models.ForeignKey(CustomUser, on_delete=models.DO_NOTHING, null=True, db_constraint=False,
+                             editable=False, related_name='+')
+    archived = models.BooleanField()
+
+    class Meta:
+        managed = False
+        db_table = 'tasks_with_archive'
+
+
+class Tombstone(models.Model):
+    TASK = 'task'
+    COLUMN = 'column'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Tombstones written while the project itself is being deleted must not block it.
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, db_constraint=False, related_name='tombstones')
+    model = models.CharField(max_length=20)
+    object_id = models.UUIDField()
+    revision = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'tasks_tombstones'
+        indexes = [
+            models.Index(fields=['project', 'revision'], name='tasks_tombstones_revision'),
+        ]
@@ -4,10 +4,11 @@ from .models import Project, TableColumn, Task
 
 class IsOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
+        # Compare ids so neither the user nor, with select_related, the project is loaded.
         if isinstance(obj, Project):
-            return obj.user == request.user
+            return obj.user_id == request.user.id
         elif isinstance(obj, TableColumn):
-            return obj.project.user == request.user
+            return obj.project.user_id == request.user.id
         elif isinstance(obj, Task):
-            return obj.project.user == request.user
+            return obj.project.user_id == request.user.id
         return False
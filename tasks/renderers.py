@@ -0,0 +1,80 @@
+import datetime
+import decimal
+import uuid
+
+import msgpack
+import orjson
+from django.utils.functional import Promise
+from rest_framework.parsers import BaseParser
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import BaseRenderer
+
+
+def default(obj):
+    """Types neither orjson nor msgpack handle natively, encoded like DRF's JSONEncoder."""
+    if isinstance(obj, Promise):
+        return str(obj)
+    elif isinstance(obj, datetime.datetime):
+        representation = obj.isoformat()
+        if representation.endswith('+00:00'):
+            representation = representation[:-6] + 'Z'
+        return representation
+    elif isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    elif isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    elif isinstance(obj, decimal.Decimal):
+        return float(obj)
+    elif isinstance(obj, uuid.UUID):
+        return str(obj)
+    elif isinstance(obj, bytes):
+        return obj.decode()
+    elif hasattr(obj, 'tolist'):
+        # numpy scalars and arrays
+        return obj.tolist()
+    elif hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not serializable')
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=default, option=self.options)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=default, use_bin_type=True)
+
+
+class PassthroughRenderer(BaseRenderer):
+    """Lets views returning a streamed HttpResponse accept any media type."""
+    media_type = '*/*'
+    format = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
@@ -1,7 +1,9 @@
+from django.utils import timezone
+from django.utils.functional import cached_property
 from rest_framework import serializers
 
 from accounts.serializers import UserProfileSerializer
-from tasks.models import Project, TableColumn, Task
+from tasks.models import ArchivedTask, Project, TableColumn, Task
 
 
 class ProjectSerializer(serializers.ModelSerializer):
@@ -9,13 +11,14 @@ class ProjectSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Project
-        fields = '__all__'
+        exclude = ['deleted_at']
 
 
 class GetTableColumnSerializer(serializers.ModelSerializer):
     class Meta:
         model = TableColumn
-        fields = ['id', 'name', 'order', 'is_done_column', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'order', 'rank', 'is_done_column', 'created_at', 'updated_at', 'task_count',
+                  'doing_count', 'done_count', 'overdue_count']
 
 
 class CreateUpdateDeleteTableColumnSerializer(serializers.ModelSerializer):
@@ -31,10 +34,32 @@ class CreateUpdateDeleteTableColumnSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class BulkCreateTableColumnSerializer(serializers.ModelSerializer):
+    project = serializers.UUIDField()
+
+    class Meta:
+        model = TableColumn
+        fields = ['name', 'order', 'is_done_column', 'project']
+
+
 class GetTaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
-        fields = ['id', 'title', 'content', 'deadline', 'priority', 'status', 'finish_at', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'content', 'deadline', 'priority', 'status', 'finish_at', 'rank', 'created_at',
+                  'updated_at']
+
+
+class SyncTaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = ['id', 'title', 'content', 'deadline', 'priority', 'status', 'finish_at', 'rank', 'column', 'revision',
+                  'created_at', 'updated_at']
+
+
+class SyncTableColumnSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TableColumn
+        fields = ['id', 'name', 'order', 'rank', 'is_done_column', 'revision', 'created_at', 'updated_at']
 
 
 class GetDetailTasksSerializer(serializers.ModelSerializer):
@@ -42,7 +67,7 @@ class GetDetailTasksSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Task
-        fields = '__all__'
+        exclude = ['user', 'sort_rank', 'sort_deadline', 'search_vector']
 
 
 class GetAllTaskSerializer(serializers.ModelSerializer):
@@ -52,21 +77,114 @@ class GetAllTaskSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Task
-        fields = '__all__'
+        exclude = ['user', 'sort_rank', 'sort_deadline', 'search_vector']
 
     def get_project_name(self, obj):
         return obj.project.name if obj.project else None
 
 
+def datetime_representation(value):
+    """Render ``value`` as DRF's DateTimeField does: local time, ISO 8601, 'Z' for UTC."""
+    value = timezone.localtime(value).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+class TaskRowSerializer:
+    """Read-only fast path producing GetAllTaskSerializer's output from ``.values()`` rows.
+
+    Rows come from ``queryset.values(*TaskRowSerializer.fields, project_name=...)``;
+    only UUIDs and datetimes need converting, so no per-field serializer runs.
+    """
+    fields = ['id', 'title', 'content', 'deadline', 'priority', 'status', 'finish_at', 'project', 'column', 'rank',
+              'created_at', 'updated_at', 'revision']
+    uuid_fields = ['id', 'project', 'column']
+    datetime_fields = ['deadline', 'finish_at', 'created_at', 'updated_at']
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @cached_property
+    def data(self):
+        return [self.to_representation(row) for row in self.rows]
+
+    def to_representation(self, row):
+        row = dict(row)
+        for field in self.uuid_fields:
+            row[field] = str(row[field])
+        for field in self.datetime_fields:
+            if row[field] is not None:
+                row[field] = datetime_representation(row[field])
+        return row
+
+
 class TaskSerializer(serializers.ModelSerializer):
     project = serializers.PrimaryKeyRelatedField(queryset=Project.objects.all(), write_only=True)
     column = serializers.PrimaryKeyRelatedField(queryset=TableColumn.objects.all(), write_only=True)
 
     class Meta:
         model = Task
-        fields = '__all__'
+        exclude = ['user', 'sort_rank', 'sort_deadline', 'search_vector']
         
     def update(self, instance, validated_data):
         validated_data.pop('project', None)
         
         return super().update(instance, validated_data)
+
+
+class BulkCreateTaskSerializer(serializers.ModelSerializer):
+    project = serializers.UUIDField()
+    column = serializers.UUIDField()
+
+    class Meta:
+        model = Task
+        fields = ['title', 'content', 'deadline', 'priority', 'status', 'finish_at', 'project', 'column']
+
+
+class BulkUpdateTaskSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField()
+    column = serializers.UUIDField(required=False)
+
+    class Meta:
+        model = Task
+        fields = ['id', 'title', 'content', 'deadline', 'priority', 'status', 'finish_at', 'column']
+
+    def validate(self, attrs):
+        # Bulk updates are validated with partial=True, which skips required fields; id never is.
+        if 'id' not in attrs:
+            raise serializers.ValidationError({'id': ['This field is required.']})
+        return attrs
+
+
+class ColumnMoveSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    after = serializers.UUIDField(required=False, allow_null=True)
+    before = serializers.UUIDField(required=False, allow_null=True)
+
+
+class TaskMoveSerializer(ColumnMoveSerializer):
+    column = serializers.UUIDField(required=False)
+
+
+class ReorderSerializer(serializers.Serializer):
+    columns = ColumnMoveSerializer(many=True, required=False)
+    tasks = TaskMoveSerializer(many=True, required=False)
+
+
+class SearchTaskSerializer(serializers.ModelSerializer):
+    project_name = serializers.CharField(read_only=True)
+    search_rank = serializers.FloatField(read_only=True)
+    title_highlight = serializers.CharField(read_only=True)
+    content_highlight = serializers.CharField(read_only=True, allow_null=True)
+    archived = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Task
+        fields = ['id', 'title', 'content', 'deadline', 'priority', 'status', 'finish_at', 'project', 'project_name',
+                  'column', 'archived', 'search_rank', 'title_highlight', 'content_highlight']
+
+
+class ArchivedTaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedTask
+        fields = ['id', 'title', 'content', 'deadline', 'priority', 'status', 'finish_at', 'project', 'column',
+                  'created_at', 'updated_at', 'archived_at']
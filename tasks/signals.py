@@ -0,0 +1,132 @@
+from django.db import connections, transaction
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, post_delete, pre_migrate, post_migrate
+from django.dispatch import receiver
+
+from accounts.models import CustomUser
+from tasks.archive import create_archive, drop_archive_view
+from tasks.counters import create_counter_triggers
+from tasks.events import publish_on_commit, object_event
+from tasks.models import Project, TableColumn, Task, Tombstone
+from tasks.serializers import SyncTableColumnSerializer, SyncTaskSerializer
+from tasks.utils import bump_user_cache_version
+
+
+def deleted_with_project(origin):
+    return isinstance(origin, Project) or (isinstance(origin, QuerySet) and origin.model is Project)
+
+
+def bump_on_commit(user_id):
+    # Bumping earlier would let a concurrent read cache the old rows under the new version.
+    transaction.on_commit(lambda: bump_user_cache_version(user_id))
+
+
+@receiver(pre_save, sender=Task)
+def task_owner(sender, instance, **kwargs):
+    instance.user_id = instance.project.user_id
+
+
+@receiver(pre_migrate)
+def backfill_task_owner(sender, using, **kwargs):
+    # Tasks written before Task.user existed; before the migrations, which make the column
+    # NOT NULL. A no-op once every row has an owner.
+    if sender.label != 'tasks':
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM information_schema.columns"
+            " WHERE table_schema = current_schema() AND table_name = %s AND column_name = 'user_id'",
+            [Task._meta.db_table]
+        )
+        if cursor.fetchone() is None:
+            return
+        cursor.execute(
+            f'UPDATE {Task._meta.db_table} SET user_id = project.user_id FROM {Project._meta.db_table} project'
+            f' WHERE {Task._meta.db_table}.project_id = project.id AND {Task._meta.db_table}.user_id IS NULL'
+        )
+
+
+@receiver(pre_migrate)
+def drop_task_archive_view(sender, using, **kwargs):
+    # Recreated by create_task_archive once the migrations have run.
+    if sender.label != 'tasks':
+        return
+    with connections[using].cursor() as cursor:
+        drop_archive_view(cursor)
+
+
+@receiver(post_migrate)
+def create_task_archive(sender, using, **kwargs):
+    # Partitioned by finish_at, which migrations cannot express; see tasks.archive.
+    if sender.label != 'tasks':
+        return
+    with connections[using].cursor() as cursor:
+        create_archive(cursor)
+
+
+@receiver(post_migrate)
+def install_task_counters(sender, using, **kwargs):
+    if sender.label != 'tasks':
+        return
+    with connections[using].cursor() as cursor:
+        create_counter_triggers(cursor)
+
+
+@receiver(post_save, sender=TableColumn)
+@receiver(post_delete, sender=TableColumn)
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def board_changed(sender, instance, origin=None, **kwargs):
+    # A cascade from a project delete is handled once by project_changed.
+    if deleted_with_project(origin):
+        return
+
+    bump_on_commit(instance.project.user_id)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def project_changed(sender, instance, **kwargs):
+    bump_on_commit(instance.user_id)
+
+
+@receiver(post_save, sender=CustomUser)
+def profile_changed(sender, instance, created, update_fields=None, **kwargs):
+    # Project lists and the bootstrap embed the profile. Logins only touch last_login,
+    # which no response shows.
+    if not created and set(update_fields or ()) != {'last_login'}:
+        bump_on_commit(instance.id)
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, **kwargs):
+    if not created:
+        instance.revision = Project.next_revision(instance.id)
+        publish_on_commit(instance.id, object_event('project', 'saved', instance, {'name': instance.name}))
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    publish_on_commit(instance.id, object_event('project', 'deleted', instance))
+
+
+@receiver(post_save, sender=TableColumn)
+@receiver(post_save, sender=Task)
+def revision_saved(sender, instance, **kwargs):
+    Project.stamp_revision(instance)
+    if sender is Task:
+        event = object_event('task', 'saved', instance, SyncTaskSerializer(instance).data)
+    else:
+        event = object_event('column', 'saved', instance, SyncTableColumnSerializer(instance).data)
+    publish_on_commit(instance.project_id, event)
+
+
+@receiver(post_delete, sender=TableColumn)
+@receiver(post_delete, sender=Task)
+def revision_deleted(sender, instance, origin=None, **kwargs):
+    if deleted_with_project(origin):
+        return
+
+    model = Tombstone.TASK if sender is Task else Tombstone.COLUMN
+    instance.revision = Project.bury(instance, model)
+    publish_on_commit(instance.project_id, object_event(model, 'deleted', instance))
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from tasks.archive import archive_tasks
+from tasks import deletion
+from tasks.models import Project, TableColumn, Task, Tombstone
+
+
+@shared_task
+def rebalance_column_ranks(project_id):
+    TableColumn.rebalance(project_id)
+
+
+@shared_task
+def rebalance_task_ranks(column_id):
+    Task.rebalance(column_id)
+
+
+@shared_task
+def prune_tombstones():
+    cutoff = timezone.now() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+    pruned = Tombstone.objects.filter(created_at__lt=cutoff).values('project_id').annotate(revision=Max('revision'))
+
+    for row in pruned:
+        with transaction.atomic():
+            Project.objects.filter(id=row['project_id']).update(
+                pruned_revision=Greatest(F('pruned_revision'), row['revision'])
+            )
+            Tombstone.objects.filter(project_id=row['project_id'], revision__lte=row['revision']).delete()
+
+
+@shared_task
+def archive_done_tasks():
+    before = timezone.now() - timedelta(days=settings.TASK_ARCHIVE_AFTER_DAYS)
+    return archive_tasks(before, settings.TASK_ARCHIVE_BATCH_SIZE)
+
+
+@shared_task
+def purge_project(project_id):
+    deletion.purge_project(project_id, settings.PROJECT_PURGE_BATCH_SIZE)
+
+
+@shared_task
+def purge_deleted_projects():
+    # Picks up purges whose worker died; a running purge has had an hour to finish or to be retried.
+    cutoff = timezone.now() - timedelta(hours=1)
+    for project_id in Project.all_objects.filter(deleted_at__lt=cutoff).values_list('id', flat=True):
+        purge_project.delay(str(project_id))
@@ -1,3 +1,320 @@
-from django.test import TestCase
+import json
+import uuid
+from datetime import timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest import skipUnless
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from accounts.models import CustomUser
+from tasks.counters import COUNTERS, reconcile_counters
+from tasks.deletion import delete_tasks
+from tasks.models import Project, TableColumn, Task, Tombstone
+from tasks.serializers import GetAllTaskSerializer, TaskRowSerializer
+from tasks.utils import SearchPagination, TaskPagination, rank_between, ranks_between, rank_for_move
+
+# Large enough that the planner prefers the indexes over scanning every row.
+QUERY_PLAN_SEED = 50000
+
+
+@skipUnless(connection.vendor == 'postgresql', "Query plans are PostgreSQL's.")
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        # check_query_plans raises CommandError on a sequential scan of tasks, or
+        # on a per-user query reading more than one partition.
+        call_command('check_query_plans', seed=QUERY_PLAN_SEED, stdout=StringIO())
+
+
+class RankTests(SimpleTestCase):
+    def test_rank_between(self):
+        for before, after in [('', None), ('', 'i'), ('i', None), ('a', 'b'), ('a', 'a1'), ('az', 'b'), ('', '01')]:
+            rank = rank_between(before, after)
+            self.assertLess(before, rank)
+            if after is not None:
+                self.assertLess(rank, after)
+
+    def test_rank_never_ends_in_zero(self):
+        # Nothing sorts between '' and a rank of only '0's, so none is ever handed out.
+        first = None
+        for _ in range(100):
+            rank = rank_between('', first)
+            self.assertFalse(rank.endswith('0'))
+            if first is not None:
+                self.assertLess(rank, first)
+            first = rank
+
+    def test_ranks_between(self):
+        self.assertEqual(ranks_between('', None, 0), [])
+        ranks = ranks_between('b', 'c', 50)
+        self.assertEqual(len(ranks), 50)
+        self.assertEqual(ranks, sorted(set(ranks)))
+        self.assertLess('b', ranks[0])
+        self.assertLess(ranks[-1], 'c')
+
+    def siblings(self, *ranks):
+        return [SimpleNamespace(id=index, rank=rank) for index, rank in enumerate(ranks)]
+
+    def test_rank_for_move(self):
+        siblings = self.siblings('h', 'p')
+
+        rank, position, rebalanced = rank_for_move(siblings)
+        self.assertEqual((position, rebalanced), (2, []))
+        self.assertLess('p', rank)
+
+        rank, position, rebalanced = rank_for_move(siblings, after_id=0)
+        self.assertEqual((position, rebalanced), (1, []))
+        self.assertTrue('h' < rank < 'p')
+
+        rank, position, rebalanced = rank_for_move(siblings, before_id=0)
+        self.assertEqual((position, rebalanced), (0, []))
+        self.assertLess(rank, 'h')
+
+    def test_rank_for_move_rebalances(self):
+        for ranks in [('i', 'i', 'i'), ('', 'i'), ('p', 'h')]:
+            siblings = self.siblings(*ranks)
+            rank, position, rebalanced = rank_for_move(siblings, after_id=0)
+            self.assertEqual(rebalanced, siblings)
+            ranks = [sibling.rank for sibling in siblings]
+            self.assertEqual(ranks, sorted(set(ranks)))
+            self.assertTrue(ranks[0] < rank < ranks[1])
+
+    def test_rank_for_move_missing_neighbour(self):
+        with self.assertRaises(ValueError):
+            rank_for_move(self.siblings('h', 'p'), after_id=5)
+        with self.assertRaises(ValueError):
+            rank_for_move(self.siblings('h', 'p'), before_id=5)
+
+
+
+class TaskTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        cls.user = CustomUser.objects.create_user(email='tests@example.com', first_name='Test', last_name='User')
+        cls.project = Project.objects.create(name='Tests', user=cls.user)
+        cls.column = TableColumn.objects.create(name='To do', order=0, project=cls.project)
+
+    @classmethod
+    def create_task(cls, **kwargs):
+        return Task.objects.create(**{
+            'title': 'Task', 'deadline': cls.now, 'priority': Task.MEDIUM, 'status': Task.DOING,
+            'project': cls.project, 'column': cls.column, **kwargs
+        })
+
+
+class CursorPaginationTests(TaskTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Pairs of tasks share a deadline, so pages must break ties on id.
+        for hours in [0, 0, 1, 1, 2, 2, 3]:
+            cls.create_task(deadline=cls.now + timedelta(hours=hours))
+
+    def request(self, **params):
+        return Request(APIRequestFactory().get('/tasks/', {'pagination': 'cursor', 'page_size': 2, **params}))
+
+    def test_cursor_round_trip(self):
+        pagination, task = TaskPagination(), Task.objects.first()
+        cursor = pagination.encode_cursor(task.deadline, task.id)
+        self.assertEqual(pagination.decode_cursor(cursor), (task.deadline, task.id))
+
+        pagination = SearchPagination()
+        self.assertEqual(pagination.decode_cursor(pagination.encode_cursor(0.25, task.id)), (0.25, task.id))
+
+    def test_invalid_cursor(self):
+        for cursor in ['', 'not a cursor', TaskPagination().encode_cursor('yesterday', 'abc')]:
+            with self.assertRaises(NotFound):
+                TaskPagination().decode_cursor(cursor)
+
+    def test_seek(self):
+        expected = list(Task.objects.filter(user=self.user).order_by('deadline', 'id').values_list('id', flat=True))
+        seen, params = [], {}
+        while True:
+            pagination = TaskPagination()
+            page = pagination.paginate_queryset(Task.objects.filter(user=self.user), self.request(**params))
+            self.assertLessEqual(len(page), 2)
+            self.assertIsNone(pagination.get_pagination()['count'])
+            seen += [task.id for task in page]
+            if pagination.next_cursor is None:
+                break
+            params = {'cursor': pagination.next_cursor}
+        self.assertEqual(seen, expected)
+
+    def test_seek_is_index_bounded(self):
+        task = Task.objects.order_by('deadline', 'id')[2]
+        pagination = TaskPagination()
+        with CaptureQueriesContext(connection) as queries:
+            pagination.paginate_queryset(Task.objects.filter(user=self.user),
+                                         self.request(cursor=pagination.encode_cursor(task.deadline, task.id)))
+        # A bound outside the OR, so the index scan starts at the cursor.
+        self.assertIn(f'"{Task._meta.db_table}"."deadline" >= ', queries[-1]['sql'])
+
+
+class TaskRowSerializerTests(TaskTestCase):
+    def test_matches_get_all_task_serializer(self):
+        self.create_task(content='Content')
+        self.create_task(status=Task.DONE, finish_at=self.now, deadline=self.now - timedelta(days=1))
+
+        tasks = Task.objects.filter(user=self.user).order_by('id')
+        rows = tasks.values(*TaskRowSerializer.fields, project_name=F('project__name'))
+        # Compared as clients see them: GetAllTaskSerializer leaves project and column as UUIDs.
+        render = lambda data: json.loads(JSONRenderer().render(data))
+        self.assertEqual(render(TaskRowSerializer(rows).data), render(GetAllTaskSerializer(tasks, many=True).data))
+
+
+class TaskCounterTests(TaskTestCase):
+    def assertCounters(self, obj, **counts):
+        obj.refresh_from_db()
+        self.assertEqual({name: getattr(obj, name) for name in COUNTERS},
+                         {name: counts.get(name, 0) for name in COUNTERS})
+
+    def test_triggers(self):
+        done = TableColumn.objects.create(name='Done', order=1, is_done_column=True, project=self.project)
+
+        task = self.create_task()
+        Task.objects.bulk_create([Task(title='Task', deadline=self.now, priority=Task.LOW, status=Task.OVERDUE,
+                                       project=self.project, column=self.column, user=self.user)
+                                  for _ in range(2)])
+        self.assertCounters(self.project, task_count=3, doing_count=1, overdue_count=2)
+        self.assertCounters(self.column, task_count=3, doing_count=1, overdue_count=2)
+
+        # A move changes the columns only.
+        task.column = done
+        task.save()
+        self.assertCounters(self.project, task_count=3, doing_count=1, overdue_count=2)
+        self.assertCounters(self.column, task_count=2, overdue_count=2)
+        self.assertCounters(done, task_count=1, doing_count=1)
+
+        task.status = Task.DONE
+        task.save()
+        self.assertCounters(self.project, task_count=3, done_count=1, overdue_count=2)
+        self.assertCounters(done, task_count=1, done_count=1)
+
+        Task.objects.filter(status=Task.OVERDUE).update(status=Task.DOING)
+        self.assertCounters(self.project, task_count=3, doing_count=2, done_count=1)
+
+        task.delete()
+        Task.objects.filter(project=self.project).delete()
+        self.assertCounters(self.project)
+        self.assertCounters(self.column)
+        self.assertCounters(done)
+
+    def test_reconcile(self):
+        self.create_task()
+        Project.objects.filter(id=self.project.id).update(task_count=5, done_count=2)
+
+        with connection.cursor() as cursor:
+            corrected = reconcile_counters(cursor)
+        self.assertEqual(corrected, {'tablecolumn': 0, 'project': 1})
+        self.assertCounters(self.project, task_count=1, doing_count=1)
+
+
+class ProjectSaveTests(TaskTestCase):
+    def test_save_keeps_concurrent_writes(self):
+        stale = Project.objects.get(id=self.project.id)
+        revision = Project.next_revision(self.project.id)
+        Project.objects.filter(id=self.project.id).update(pruned_revision=revision)
+
+        stale.name = 'Renamed'
+        stale.save()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.name, 'Renamed')
+        # The rename itself advances the revision once more.
+        self.assertEqual(self.project.revision, revision + 1)
+        self.assertEqual(self.project.pruned_revision, revision)
+
+    def test_save_keeps_deletion(self):
+        stale = Project.objects.get(id=self.project.id)
+        Project.all_objects.filter(id=self.project.id).update(deleted_at=self.now)
+
+        stale.name = 'Renamed'
+        stale.save()
+        self.assertEqual(Project.all_objects.get(id=self.project.id).deleted_at, self.now)
+
+
+class ProfileCacheTests(TaskTestCase):
+    def test_profile_change_invalidates_cached_responses(self):
+        self.user.first_name = 'Renamed'
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.save()
+        self.assertEqual(len(callbacks), 1)
+
+        self.user.last_login = self.now
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.save(update_fields=['last_login'])
+        self.assertEqual(callbacks, [])
+
+
+class DeleteTasksTests(TaskTestCase):
+    def test_delete_tasks(self):
+        tasks = [self.create_task(), self.create_task()]
+        other_user = CustomUser.objects.create_user(email='other@example.com', first_name='Other', last_name='User')
+        ids = [task.id for task in tasks]
+
+        self.assertEqual(delete_tasks(other_user.id, ids), set())
+        self.assertEqual(delete_tasks(self.user.id, ids + [uuid.uuid4()]), set(ids))
+
+        self.assertFalse(Task.objects.filter(id__in=ids).exists())
+        self.project.refresh_from_db()
+        tombstones = Tombstone.objects.filter(project=self.project, model=Tombstone.TASK)
+        self.assertEqual({tombstone.object_id for tombstone in tombstones}, set(ids))
+        self.assertEqual({tombstone.revision for tombstone in tombstones}, {self.project.revision})
+        self.assertEqual(self.project.task_count, 0)
+
+
+class TaskMoveTests(TaskTestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.target = TableColumn.objects.create(name='Doing', order=1, project=self.project)
+        self.create_task(column=self.target, rank='m')
+
+    def test_update_moves_to_end_of_column(self):
+        task = self.create_task(rank='z')
+        response = self.client.patch(f'/api/tasks/task/{task.id}/', {'column': str(self.target.id)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        task.refresh_from_db()
+        self.assertEqual(task.column_id, self.target.id)
+        self.assertTrue('m' < task.rank < 'z')
+
+    def test_bulk_update_moves_to_end_of_column(self):
+        tasks = [self.create_task(rank='m'), self.create_task(rank='n')]
+        response = self.client.patch('/api/tasks/task/bulk/', [
+            {'id': str(task.id), 'column': str(self.target.id)} for task in tasks
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        ranks = [Task.objects.get(id=task.id).rank for task in tasks]
+        self.assertLess('m', ranks[0])
+        self.assertLess(ranks[0], ranks[1])
+
+
+class TaskPartitionPruningTests(TaskTestCase):
+    client_class = APIClient
+
+    def test_writes_name_the_owner(self):
+        task = self.create_task()
+        task.title = 'Renamed'
+        with CaptureQueriesContext(connection) as queries:
+            task.save()
+        table = f'"{Task._meta.db_table}"'
+        update = next(query['sql'] for query in queries if query['sql'].startswith(f'UPDATE {table}'))
+        self.assertIn(f'{table}."user_id" = ', update)
+
+        self.client.force_authenticate(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(f'/api/tasks/task/{task.id}/')
+        self.assertEqual(response.status_code, 200)
+        delete = next(query['sql'] for query in queries if query['sql'].startswith(f'DELETE FROM {table}'))
+        self.assertIn('user_id = ', delete)
+        self.assertFalse(Task.objects.filter(id=task.id).exists())
@@ -1,19 +1,43 @@
+from django.conf import settings
 from django.urls import path
 
 from tasks.views import *
 
+if settings.ASYNC_READ_VIEWS:
+    from tasks.async_views import AsyncTaskListView as TaskListView, AsyncAllTaskListView as AllTaskListView, \
+        AsyncOverdueTasksListView as OverdueTasksListView, AsyncOnDeadlineTasksListView as OnDeadlineTasksListView, \
+        AsyncTasksByMonthView as TasksByMonthView
+
 urlpatterns = [
+    path('bootstrap/', BootstrapView.as_view(), name='bootstrap'),
     path('project/', ProjectListView.as_view(), name='project_get_create'),
     path('project/<uuid:pk>/', ProjectDetailView.as_view(), name='project_update_delete'),
+    path('project/<uuid:pk>/deletion/', ProjectDeletionView.as_view(), name='project_deletion'),
     path('column/get/<uuid:project_id>/', TableColumnListView.as_view(), name='column_get'),
     path('column/create/', TableColumnCreateView.as_view(), name='column_create'),
     path('column/create-many/', CreateManyTableColumnView.as_view(), name='column_create_many'),
     path('column/<uuid:pk>/', TableColumnDetailView.as_view(), name='column_update_delete'),
+    path('column/<uuid:pk>/move/', TableColumnMoveView.as_view(), name='column_move'),
     path('task/get/<uuid:project_id>/', TaskListView.as_view(), name='task_get'),
     path('all-task/', AllTaskListView.as_view(), name='all_task_list'),
     path('overdue-tasks/', OverdueTasksListView.as_view(), name='overdue_task_list'),
     path('on-deadline-tasks/', OnDeadlineTasksListView.as_view(), name='on_deadline_task_list'),
     path('tasks-by-month/', TasksByMonthView.as_view(), name='tasks_by_month'),
     path('task/', TaskCreateView.as_view(), name='task_create'),
+    path('task/bulk/', TaskBulkView.as_view(), name='task_bulk'),
     path('task/<uuid:pk>/', TaskDetailView.as_view(), name='task_update_delete'),
+    path('task/<uuid:pk>/move/', TaskMoveView.as_view(), name='task_move'),
+    path('reorder/', ReorderView.as_view(), name='reorder'),
+    path('sync/<uuid:project_id>/', ProjectSyncView.as_view(), name='project_sync'),
+    path('search/', SearchTaskListView.as_view(), name='task_search'),
+    path('archive/', ArchivedTaskListView.as_view(), name='archive_list'),
+    path('archive/<uuid:pk>/restore/', RestoreArchivedTaskView.as_view(), name='archive_restore'),
+    path('export/', ExportView.as_view(), name='export'),
+    path('import/', ImportView.as_view(), name='import'),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    from tasks.async_views import ProjectEventsView
+
+    # An endless stream: under WSGI it would hold a worker and buffer forever, so it is ASGI only.
+    urlpatterns.append(path('events/<uuid:project_id>/', ProjectEventsView.as_view(), name='project_events'))
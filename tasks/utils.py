@@ -1,12 +1,260 @@
+import hashlib
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from rest_framework import status
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
 
 
 class Pagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
+    pagination_mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    cursor_ordering = None
+    invalid_cursor_message = 'Invalid cursor'
+
+    def use_cursor(self, request):
+        return self.cursor_ordering is not None and (
+            request.query_params.get(self.pagination_mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.use_cursor(request)
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        # Keyset pagination: seek past the last cursor_ordering key of the previous
+        # page instead of counting and OFFSET-scanning the whole result.
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        field, tiebreaker = self.cursor_ordering
+        descending = field.startswith('-')
+        field = field.lstrip('-')
+        queryset = queryset.order_by(f'-{field}' if descending else field, tiebreaker)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            value, pk = self.decode_cursor(encoded)
+            # The redundant bound lets the index scan start at the cursor; PostgreSQL
+            # does not derive it from the OR.
+            queryset = queryset.filter(
+                Q(**{f'{field}__{"lte" if descending else "gte"}': value}),
+                Q(**{f'{field}__{"lt" if descending else "gt"}': value})
+                | Q(**{field: value, f'{tiebreaker}__gt': pk})
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        self.next_cursor = None
+        if self.has_next:
+            last = self.page[-1]
+            if isinstance(last, dict):
+                self.next_cursor = self.encode_cursor(last[field], last[tiebreaker])
+            else:
+                self.next_cursor = self.encode_cursor(getattr(last, field), getattr(last, tiebreaker))
+
+        return self.page
+
+    def encode_cursor(self, value, pk):
+        value = value.isoformat() if hasattr(value, 'isoformat') else repr(value)
+        return urlsafe_b64encode(f'{value}|{pk}'.encode()).decode()
+
+    def decode_cursor(self, encoded):
+        try:
+            value, pk = urlsafe_b64decode(encoded.encode()).decode().split('|')
+            return self.parse_cursor_value(value), UUID(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def parse_cursor_value(self, value):
+        return value
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_pagination(self):
+        if not self.cursor_mode:
+            return {
+                'count': self.page.paginator.count,
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+                'page_size': self.page_size,
+                'current_page': self.page.number
+            }
+
+        # The total is not counted in cursor mode; it would cost a full scan.
+        return {
+            'count': None,
+            'next': self.get_next_link(),
+            'previous': None,
+            'page_size': self.page_size,
+            'current_page': None
+        }
+
+
+class TaskPagination(Pagination):
+    cursor_ordering = ('deadline', 'id')
+
+    def parse_cursor_value(self, value):
+        return datetime.fromisoformat(value)
+
+
+class SearchPagination(Pagination):
+    cursor_ordering = ('-search_rank', 'id')
+
+    def use_cursor(self, request):
+        # Search results are always served by cursor, there is no stable page count.
+        return True
+
+    def parse_cursor_value(self, value):
+        return float(value)
+
+
+class ETagMixin:
+    """Answer If-None-Match with 304 before the list is built.
+
+    Views implement ``get_etag_versions()`` with a cheap query returning
+    whatever changes whenever the payload does, or ``None`` to skip.
+    """
+
+    def get_etag_versions(self):
+        return None
+
+    def get(self, request, *args, **kwargs):
+        not_modified = self.check_etag(request)
+        if not_modified is not None:
+            return not_modified
+
+        return super().get(request, *args, **kwargs)
+
+    def check_etag(self, request):
+        """Compute ``self.etag``; return a 304 response when the client already has it."""
+        self.etag = None
+        versions = self.get_etag_versions()
+        if versions is None:
+            return None
+
+        parts = [request.get_full_path(), request.META.get('HTTP_ACCEPT', ''), *versions]
+        self.etag = quote_etag(hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest())
+
+        not_modified = get_conditional_response(request, etag=self.etag)
+        if not_modified is not None:
+            not_modified['ETag'] = self.etag
+        return not_modified
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'etag', None) and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = self.etag
+        return response
+
+
+class CachedResponseMixin:
+    """Serve repeated GETs from the cache without touching the database.
+
+    Keys combine the view, the user's data version, the full path and the
+    Accept header. Writes bump the version (see ``tasks.signals``), so stale
+    entries are never read again and simply expire. Put it after
+    ``ETagMixin`` so a matching If-None-Match still gets its 304.
+    """
+    response_cache_timeout = None
+
+    def get(self, request, *args, **kwargs):
+        cached = self.get_cached_response(request)
+        if cached is not None:
+            return cached
+
+        return super().get(request, *args, **kwargs)
+
+    def get_cached_response(self, request):
+        """Return the cached response, or remember the key to store this one under."""
+        self.response_cache_key = None
+        if not request.user.is_authenticated:
+            return None
+
+        digest = hashlib.sha1(f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}".encode()).hexdigest()
+        key = 'response:{}:{}:{}:{}'.format(
+            type(self).__name__, request.user.id, get_user_cache_version(request.user.id), digest
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        self.response_cache_key = key
+        return None
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if not getattr(self, 'defer_response_cache', False):
+            self.cache_response(response)
+        return response
+
+    def cache_response(self, response):
+        # The browsable API embeds per-request tokens, so only API formats are kept.
+        if (getattr(self, 'response_cache_key', None) and isinstance(response, Response)
+                and response.status_code == status.HTTP_200_OK
+                and response.accepted_renderer.media_type != 'text/html'):
+            response.render()
+            timeout = self.response_cache_timeout or settings.RESPONSE_CACHE_TIMEOUT
+            cache.set(self.response_cache_key, (response.content, response['Content-Type']), timeout)
+
+
+class AsyncListMixin:
+    """Async ``get`` for list views served by adrf under ASGI.
+
+    The ETag and response cache lookups of the sync view run together in a
+    worker thread; on a miss ``alist()`` builds the page with the async ORM,
+    and the response is rendered and cached in a worker thread as well.
+    """
+
+    async def async_dispatch(self, request, *args, **kwargs):
+        # finalize_response is sync, so it must not block the event loop on the cache.
+        self.defer_response_cache = True
+        response = await super().async_dispatch(request, *args, **kwargs)
+        if hasattr(self, 'cache_response'):
+            await sync_to_async(self.cache_response)(response)
+        return response
+
+    async def get(self, request, *args, **kwargs):
+        response = await sync_to_async(self.get_early_response)(request)
+        if response is not None:
+            return response
+
+        return await self.alist(request, *args, **kwargs)
+
+    def get_early_response(self, request):
+        for check in (getattr(self, 'check_etag', None), getattr(self, 'get_cached_response', None)):
+            response = check(request) if check else None
+            if response is not None:
+                return response
+        return None
 
 
 class APIResponse(Response):
@@ -30,3 +278,79 @@ class PaginationAPIResponse(Response):
         }
 
         super().__init__(data=response_data, status=status_code)
+
+
+def get_user_cache_version(user_id):
+    return cache.get_or_set(f'tasks_version:{user_id}', 0, None)
+
+
+async def aget_user_cache_version(user_id):
+    return await cache.aget_or_set(f'tasks_version:{user_id}', 0, None)
+
+
+def bump_user_cache_version(user_id):
+    cache.set(f'tasks_version:{user_id}', time.time_ns(), None)
+
+
+RANK_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+RANK_REBALANCE_LENGTH = 32
+
+
+def rank_between(before, after):
+    """Return a rank sorting strictly between ``before`` and ``after``.
+
+    Ranks are base-36 strings compared byte-wise; ``before=''`` and
+    ``after=None`` stand for the start and the end of the list.
+    """
+    before = before or ''
+    rank = ''
+    index = 0
+    while True:
+        low = RANK_DIGITS.index(before[index]) if index < len(before) else 0
+        high = RANK_DIGITS.index(after[index]) if after is not None and index < len(after) else len(RANK_DIGITS)
+        if high - low > 1:
+            return rank + RANK_DIGITS[(low + high) // 2]
+
+        rank += RANK_DIGITS[low]
+        if low < high:
+            after = None
+        index += 1
+
+
+def ranks_between(before, after, count):
+    """Return ``count`` evenly spread ranks between ``before`` and ``after``."""
+    if count <= 0:
+        return []
+
+    middle = rank_between(before, after)
+    left = (count - 1) // 2
+    return ranks_between(before, middle, left) + [middle] + ranks_between(middle, after, count - 1 - left)
+
+
+def rank_for_move(siblings, after_id=None, before_id=None):
+    """Compute the rank of an item moved among ``siblings``.
+
+    ``siblings`` are the other items of the list, sorted by rank. The item
+    goes right after ``after_id``, right before ``before_id`` or, when
+    neither is given, at the end. Returns the new rank, the position to
+    insert the item at and the siblings whose rank had to be reassigned
+    because the list held unranked or colliding ranks.
+    """
+    ids = [sibling.id for sibling in siblings]
+    if after_id is not None:
+        position = ids.index(after_id) + 1
+    elif before_id is not None:
+        position = ids.index(before_id)
+    else:
+        position = len(siblings)
+
+    rebalanced = []
+    ranks = [sibling.rank for sibling in siblings]
+    if any(not rank for rank in ranks) or any(low >= high for low, high in zip(ranks, ranks[1:])):
+        for sibling, rank in zip(siblings, ranks_between('', None, len(siblings))):
+            sibling.rank = rank
+        rebalanced = list(siblings)
+
+    low = siblings[position - 1].rank if position > 0 else ''
+    high = siblings[position].rank if position < len(siblings) else None
+    return rank_between(low, high), position, rebalanced
@@ -1,19 +1,37 @@
+import csv
 from collections import defaultdict
 from datetime import datetime, timedelta
 from http import HTTPStatus
-
+from uuid import UUID
+
+import orjson
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Window
+from django.db.models.functions import RowNumber
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from rest_framework import generics, status
+from rest_framework import generics, serializers, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 
+from tasks.archive import restore_task
+from tasks.deletion import delete_tasks, hide_project, get_progress
+from tasks.importer import TaskImporter, TaskImportError, open_text
+from tasks.models import ArchivedTask, TaskWithArchive, Tombstone
 from tasks.permissions import IsOwner
+from tasks.renderers import default, ORJSONRenderer, PassthroughRenderer
 from tasks.serializers import *
-from tasks.utils import Pagination, APIResponse, PaginationAPIResponse
+from tasks.tasks import rebalance_column_ranks, rebalance_task_ranks, purge_project
+from tasks.utils import Pagination, TaskPagination, SearchPagination, ETagMixin, CachedResponseMixin, APIResponse, PaginationAPIResponse, \
+    get_user_cache_version, bump_user_cache_version, ranks_between, rank_for_move, RANK_REBALANCE_LENGTH
+
+# Calendar lists are relative to now, so they are cached only briefly.
+CALENDAR_CACHE_TIMEOUT = 60
 
 
 # Create your views here.
-class ProjectListView(generics.ListCreateAPIView):
+class ProjectListView(ETagMixin, CachedResponseMixin, generics.ListCreateAPIView):
     model = Project.objects.all()
     serializer_class = ProjectSerializer
     pagination_class = Pagination
@@ -46,6 +64,10 @@ class ProjectListView(generics.ListCreateAPIView):
     def get_queryset(self):
         return Project.objects.filter(user=self.request.user)
 
+    def get_etag_versions(self):
+        projects = Project.objects.filter(user=self.request.user).order_by('id').values_list('id', 'revision')
+        return [self.request.user.updated_at, *projects]
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
@@ -77,13 +99,78 @@ class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         self.perform_destroy(instance)
-        return APIResponse(status_code=status.HTTP_200_OK)
+        return APIResponse({'id': instance.id, 'status': 'pending'})
+
+    def perform_destroy(self, instance):
+        # Hidden now, purged in batches by a worker; see ProjectDeletionView for progress.
+        with transaction.atomic():
+            hide_project(instance)
+            transaction.on_commit(lambda: purge_project.delay(str(instance.id)))
 
     def get_queryset(self):
         return Project.objects.filter(user=self.request.user)
 
 
-class TableColumnListView(generics.ListAPIView):
+class ProjectDeletionView(APIView):
+    def get(self, request, pk):
+        progress = get_progress(pk)
+        if progress is None or progress['user_id'] != request.user.id:
+            # Progress is gone from the cache but the purge has not finished.
+            if Project.all_objects.filter(id=pk, user=request.user, deleted_at__isnull=False).exists():
+                progress = {'status': 'pending', 'total': None, 'deleted': 0}
+            else:
+                return APIResponse({'error': 'PROJECT_DELETION_NOT_FOUND'}, status_code=HTTPStatus.NOT_FOUND)
+        return APIResponse({
+            'id': pk,
+            'status': progress['status'],
+            'total': progress['total'],
+            'deleted': progress['deleted'],
+        })
+
+
+class BootstrapView(ETagMixin, CachedResponseMixin, generics.ListAPIView):
+    """Everything the first paint needs: the user, their projects and columns with task counts.
+
+    Two queries whatever the number of projects; the counts are the
+    trigger-maintained counters, not COUNTs over tasks.
+    """
+    counters = {'total': 'task_count', 'doing': 'doing_count', 'done': 'done_count', 'overdue': 'overdue_count'}
+    project_fields = ['id', 'name', 'created_at', 'updated_at', 'revision', *counters.values()]
+    column_fields = ['id', 'project_id', 'name', 'order', 'rank', 'is_done_column', *counters.values()]
+
+    def list(self, request, *args, **kwargs):
+        projects = list(Project.objects.filter(user=request.user).values(*self.project_fields))
+        columns = TableColumn.objects.filter(project_id__in=[project['id'] for project in projects]).order_by(
+            'project_id', 'rank', 'order', 'name'
+        ).values(*self.column_fields)
+
+        columns_by_project = defaultdict(list)
+        for column in columns:
+            column['counts'] = self.pop_counts(column)
+            columns_by_project[column.pop('project_id')].append(column)
+
+        for project in projects:
+            # Formatted like every other project payload, which goes through ProjectSerializer.
+            project['created_at'] = datetime_representation(project['created_at'])
+            project['updated_at'] = datetime_representation(project['updated_at'])
+            project['counts'] = self.pop_counts(project)
+            project['columns'] = columns_by_project[project['id']]
+
+        return APIResponse({
+            'user': UserProfileSerializer(request.user).data,
+            'projects': projects,
+        })
+
+    def pop_counts(self, row):
+        return {name: row.pop(field) for name, field in self.counters.items()}
+
+    def get_etag_versions(self):
+        # Any write to a project, its columns or its tasks advances its revision.
+        projects = Project.objects.filter(user=self.request.user).order_by('id').values_list('id', 'revision')
+        return [self.request.user.updated_at, *projects]
+
+
+class TableColumnListView(ETagMixin, CachedResponseMixin, generics.ListAPIView):
     model = TableColumn.objects.all()
     serializer_class = GetTableColumnSerializer
     pagination_class = Pagination
@@ -127,6 +214,9 @@ class TableColumnListView(generics.ListAPIView):
         project_id = self.kwargs['project_id']
         return TableColumn.objects.filter(project_id=project_id)
 
+    def get_etag_versions(self):
+        return Project.objects.filter(id=self.kwargs['project_id']).values_list('revision', 'user__updated_at').first()
+
 
 class TableColumnCreateView(generics.CreateAPIView):
     model = TableColumn.objects.all()
@@ -138,16 +228,19 @@ class TableColumnCreateView(generics.CreateAPIView):
         self.perform_create(serializer)
         return APIResponse(serializer.data)
 
+    def perform_create(self, serializer):
+        project = serializer.validated_data['project']
+        serializer.save(rank=TableColumn.next_ranks(project.id)[0])
+
 
 class CreateManyTableColumnView(generics.CreateAPIView):
     model = TableColumn
-    serializer_class = CreateUpdateDeleteTableColumnSerializer
+    serializer_class = BulkCreateTableColumnSerializer
 
     def create(self, request, *args, **kwargs):
         columns_data = request.data
 
         if isinstance(columns_data, list):
-            data = []
             errors = []
             is_valid = True
 
@@ -166,10 +259,50 @@ class CreateManyTableColumnView(generics.CreateAPIView):
                     status_code=status.HTTP_400_BAD_REQUEST
                 )
 
-            for serializer in serializers:
-                self.perform_create(serializer)
-                data.append(serializer.data)
+            # Resolve and check ownership of every referenced project at once.
+            projects = Project.objects.filter(user=request.user).in_bulk(
+                {serializer.validated_data['project'] for serializer in serializers}
+            )
+
+            columns = []
+            for index, serializer in enumerate(serializers):
+                data = dict(serializer.validated_data)
+                project = projects.get(data.pop('project'))
+                if project is None:
+                    is_valid = False
+                    errors.append({
+                        "index": index,
+                        "errors": {"project": ["PROJECT_NOT_FOUND"]}
+                    })
+                    continue
+                columns.append(TableColumn(project=project, **data))
+
+            if not is_valid:
+                return APIResponse(
+                    data={"errors": errors},
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
 
+            # Append the new columns after the existing ones, following their order.
+            columns_by_project = defaultdict(list)
+            for column in columns:
+                columns_by_project[column.project_id].append(column)
+            last_ranks = dict(
+                TableColumn.objects.filter(project_id__in=columns_by_project).order_by()
+                .values('project_id').annotate(last=Max('rank')).values_list('project_id', 'last')
+            )
+            for project_id, project_columns in columns_by_project.items():
+                project_columns.sort(key=lambda column: column.order)
+                ranks = ranks_between(last_ranks.get(project_id), None, len(project_columns))
+                for column, rank in zip(project_columns, ranks):
+                    column.rank = rank
+
+            with transaction.atomic():
+                Project.stamp_revisions(columns)
+                TableColumn.objects.bulk_create(columns)
+                transaction.on_commit(lambda: bump_user_cache_version(request.user.id))
+
+            data = CreateUpdateDeleteTableColumnSerializer(columns, many=True).data
             return APIResponse(data=data, status_code=status.HTTP_201_CREATED)
         else:
             return APIResponse(
@@ -183,6 +316,9 @@ class TableColumnDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = CreateUpdateDeleteTableColumnSerializer
     permission_classes = [IsAuthenticated, IsOwner]
 
+    def get_queryset(self):
+        return TableColumn.objects.filter(project__user=self.request.user).select_related('project')
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance)
@@ -193,7 +329,14 @@ class TableColumnDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
+
+        # Clients that still renumber `order` get the column re-ranked to match.
+        order = serializer.validated_data.get('order')
+        if order is not None and order != instance.order:
+            instance.order = order
+            serializer.save(rank=TableColumn.rank_for_order(instance))
+        else:
+            self.perform_update(serializer)
 
         if getattr(instance, '_prefetched_objects_cache', None):
             # If 'prefetch_related' has been applied to a queryset, we need to
@@ -208,31 +351,60 @@ class TableColumnDetailView(generics.RetrieveUpdateDestroyAPIView):
         return APIResponse(status_code=status.HTTP_200_OK)
 
 
-class TaskListView(generics.ListAPIView):
+class TaskListView(ETagMixin, CachedResponseMixin, generics.ListAPIView):
     model = Task.order_by_status_and_time()
     serializer_class = GetTaskSerializer
     pagination_class = Pagination
 
     def list(self, request, *args, **kwargs):
-        project_id = self.kwargs['project_id']
-
-        try:
-            project = Project.objects.get(id=project_id)
-        except Project.DoesNotExist:
+        project = Project.objects.select_related('user').filter(id=self.kwargs['project_id']).first()
+        if project is None:
             return APIResponse({
                 'error': 'Project not found'
             }, status_code=status.HTTP_404_NOT_FOUND)
 
-        project_serializer = ProjectSerializer(project)
-
-        columns = TableColumn.objects.filter(project=project).order_by('order')
-
-        tasks = Task.order_by_status_and_time()
-        tasks = tasks.filter(project=project)
+        try:
+            tasks_per_column = self.get_tasks_per_column()
+        except ValueError:
+            return APIResponse({"error": "tasks_per_column must be a positive integer."},
+                               status_code=HTTPStatus.BAD_REQUEST)
+
+        # Paginate the columns in the database first, then load the tasks of the
+        # columns on this page only, in a single query.
+        columns = TableColumn.objects.filter(project=project)
+        page = self.paginate_queryset(columns)
+        page_columns = list(columns) if page is None else page
+
+        tasks = list(self.get_board_tasks(project, page_columns, tasks_per_column))
+        return self.board_response(project, page_columns, tasks, paginated=page is not None)
+
+    def get_tasks_per_column(self):
+        """The optional ``tasks_per_column`` cap; raises ValueError unless it is a positive integer."""
+        tasks_per_column = self.request.GET.get('tasks_per_column')
+        if tasks_per_column is None:
+            return None
+        tasks_per_column = int(tasks_per_column)
+        if tasks_per_column < 1:
+            raise ValueError(tasks_per_column)
+        return tasks_per_column
+
+    def get_board_tasks(self, project, columns, tasks_per_column=None):
+        # The owner filter prunes the tasks partitions to one.
+        tasks = self.get_queryset().filter(user_id=project.user_id, column__in=[column.id for column in columns])
+        if tasks_per_column:
+            tasks = tasks.annotate(
+                column_position=Window(
+                    expression=RowNumber(),
+                    partition_by=F('column_id'),
+                    order_by=tasks.query.order_by,
+                )
+            ).filter(column_position__lte=tasks_per_column)
+        return tasks
 
+    def board_response(self, project, columns, tasks, paginated):
         tasks_grouped_by_column = defaultdict(list)
         for task in tasks:
-            tasks_grouped_by_column[task.column.id].append(task)
+            tasks_grouped_by_column[task.column_id].append(task)
 
         column_data = []
         for column in columns:
@@ -243,171 +415,94 @@ class TaskListView(generics.ListAPIView):
                     'id': column.id,
                     'name': column.name,
                     'order': column.order,
+                    'rank': column.rank,
                     'is_done_column': column.is_done_column,
+                    'task_count': column.task_count,
+                    'doing_count': column.doing_count,
+                    'done_count': column.done_count,
+                    'overdue_count': column.overdue_count,
                 },
                 'tasks': task_serializer.data
             })
 
-        page = self.paginate_queryset(column_data)
-        if page is not None:
-            pagination = {
-                'count': self.paginator.page.paginator.count,
-                'next': self.paginator.get_next_link(),
-                'previous': self.paginator.get_previous_link(),
-                'page_size': self.paginator.page_size,
-                'current_page': self.paginator.page.number
-            }
-            return PaginationAPIResponse({
-                'project': project_serializer.data,
-                'columns': page,
-            }, pagination=pagination)
-
-        return APIResponse({
-            'project': project_serializer.data,
+        data = {
+            'project': ProjectSerializer(project).data,
             'columns': column_data,
-        })
+        }
+        if paginated:
+            return PaginationAPIResponse(data, pagination=self.paginator.get_pagination())
+        return APIResponse(data)
 
     def get_queryset(self):
+        # get_board_tasks adds the owner, which prunes the tasks partitions to one.
         project_id = self.kwargs['project_id']
-        return Task.objects.filter(project_id=project_id)
+        if self.request.GET.get('ordering') == 'rank':
+            return Task.order_by_rank().filter(project_id=project_id)
+        return Task.order_by_status_and_time().filter(project_id=project_id)
 
+    def get_etag_versions(self):
+        return Project.objects.filter(id=self.kwargs['project_id']).values_list('revision', 'user__updated_at').first()
 
-class AllTaskListView(generics.ListAPIView):
+
+class TaskRowListView(CachedResponseMixin, generics.ListAPIView):
+    """Calendar task lists; subclasses only choose the rows in ``get_queryset``."""
     model = Task.order_by_status_and_time()
     serializer_class = GetAllTaskSerializer
-    pagination_class = Pagination
+    pagination_class = TaskPagination
+    response_cache_timeout = CALENDAR_CACHE_TIMEOUT
 
     def list(self, request, *args, **kwargs):
-        time_param = request.GET.get('time')
-        time_filter = None
-
-        if time_param:
-            try:
-                time_filter = datetime.strptime(time_param, '%Y-%m-%d %H:%M:%S')
-                time_filter = timezone.make_aware(time_filter)
-            except ValueError:
-                return APIResponse({"error": "Invalid time format, use 'YYYY-MM-DD HH:mm:ss'."},
-                                   status_code=HTTPStatus.BAD_REQUEST)
+        try:
+            time_filter = self.get_time_filter()
+        except ValueError:
+            return APIResponse({"error": "Invalid time format, use 'YYYY-MM-DD HH:mm:ss'."},
+                               status_code=HTTPStatus.BAD_REQUEST)
 
         queryset = self.filter_queryset(self.get_queryset(time_filter))
 
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            pagination = {
-                'count': self.paginator.page.paginator.count,
-                'next': self.paginator.get_next_link(),
-                'previous': self.paginator.get_previous_link(),
-                'page_size': self.paginator.page_size,
-                'current_page': self.paginator.page.number
-            }
-            return PaginationAPIResponse({
-                'total_tasks': len(serializer.data),
-                'tasks': serializer.data,
-            }, pagination=pagination)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return APIResponse({
+            return self.rows_response(page, paginated=True)
+        return self.rows_response(queryset, paginated=False)
+
+    def get_time_filter(self):
+        time_param = self.request.GET.get('time')
+        if not time_param:
+            return None
+        return timezone.make_aware(datetime.strptime(time_param, '%Y-%m-%d %H:%M:%S'))
+
+    def rows_response(self, rows, paginated):
+        serializer = TaskRowSerializer(rows)
+        data = {
             'total_tasks': len(serializer.data),
             'tasks': serializer.data,
-        })
-
-    def get_queryset(self, time_filter=None):
-        return Task.objects.filter(project__user=self.request.user, deadline__gte=time_filter, status=1)
-
-
-class OverdueTasksListView(generics.ListAPIView):
-    model = Task.order_by_status_and_time()
-    serializer_class = GetAllTaskSerializer
-    pagination_class = Pagination
-
-    def list(self, request, *args, **kwargs):
-        time_param = request.GET.get('time')
-        time_filter = None
-
-        if time_param:
-            try:
-                time_filter = datetime.strptime(time_param, '%Y-%m-%d %H:%M:%S')
-                time_filter = timezone.make_aware(time_filter)
-            except ValueError:
-                return APIResponse({"error": "Invalid time format, use 'YYYY-MM-DD HH:mm:ss'."},
-                                   status_code=HTTPStatus.BAD_REQUEST)
+        }
+        if paginated:
+            return PaginationAPIResponse(data, pagination=self.paginator.get_pagination())
+        return APIResponse(data)
 
-        queryset = self.filter_queryset(self.get_queryset(time_filter))
 
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            pagination = {
-                'count': self.paginator.page.paginator.count,
-                'next': self.paginator.get_next_link(),
-                'previous': self.paginator.get_previous_link(),
-                'page_size': self.paginator.page_size,
-                'current_page': self.paginator.page.number
-            }
-            return PaginationAPIResponse({
-                'total_tasks': len(serializer.data),
-                'tasks': serializer.data,
-            }, pagination=pagination)
+class AllTaskListView(TaskRowListView):
+    def get_queryset(self, time_filter=None):
+        return Task.order_by_status_and_time().filter(
+            user=self.request.user, deadline__gte=time_filter, status=1
+        ).values(*TaskRowSerializer.fields, project_name=F('project__name'))
 
-        serializer = self.get_serializer(queryset, many=True)
-        return APIResponse({
-            'total_tasks': len(serializer.data),
-            'tasks': serializer.data,
-        })
 
+class OverdueTasksListView(TaskRowListView):
     def get_queryset(self, time_filter=None):
-        queryset = Task.objects.filter(project__user=self.request.user, status=3)
+        queryset = Task.order_by_status_and_time().filter(user=self.request.user, status=3)
         if time_filter:
             queryset = queryset.filter(deadline__lt=time_filter)
         else:
             queryset = queryset.filter(deadline__lt=timezone.localtime(timezone.now()))
 
-        return queryset
-
-
-class OnDeadlineTasksListView(generics.ListAPIView):
-    model = Task.order_by_status_and_time()
-    serializer_class = GetAllTaskSerializer
-    pagination_class = Pagination
+        return queryset.values(*TaskRowSerializer.fields, project_name=F('project__name'))
 
-    def list(self, request, *args, **kwargs):
-        time_param = request.GET.get('time')
-        time_filter = None
-
-        if time_param:
-            try:
-                time_filter = datetime.strptime(time_param, '%Y-%m-%d %H:%M:%S')
-                time_filter = timezone.make_aware(time_filter)
-            except ValueError:
-                return APIResponse({"error": "Invalid time format, use 'YYYY-MM-DD HH:mm:ss'."},
-                                   status_code=HTTPStatus.BAD_REQUEST)
-
-        queryset = self.filter_queryset(self.get_queryset(time_filter))
-
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            pagination = {
-                'count': self.paginator.page.paginator.count,
-                'next': self.paginator.get_next_link(),
-                'previous': self.paginator.get_previous_link(),
-                'page_size': self.paginator.page_size,
-                'current_page': self.paginator.page.number
-            }
-            return PaginationAPIResponse({
-                'total_tasks': len(serializer.data),
-                'tasks': serializer.data,
-            }, pagination=pagination)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return APIResponse({
-            'total_tasks': len(serializer.data),
-            'tasks': serializer.data,
-        })
 
+class OnDeadlineTasksListView(TaskRowListView):
     def get_queryset(self, time_filter=None):
-        queryset = Task.objects.filter(project__user=self.request.user, status=1)
+        queryset = Task.order_by_status_and_time().filter(user=self.request.user, status=1)
 
         if time_filter:
             start_of_day = time_filter.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -415,63 +510,90 @@ class OnDeadlineTasksListView(generics.ListAPIView):
 
             queryset = queryset.filter(deadline__range=[start_of_day, end_of_day])
 
-        return queryset
+        return queryset.values(*TaskRowSerializer.fields, project_name=F('project__name'))
 
 
 class TasksByMonthView(APIView):
 
     def get(self, request, *args, **kwargs):
-        month = request.GET.get('month')
-        year = request.GET.get('year')
-
         try:
-            month = int(month)
-            year = int(year)
-        except (ValueError, TypeError):
+            year, month = self.get_month()
+        except ValueError:
             return APIResponse({"error": "Invalid month or year."}, status_code=400)
 
+        cache_key = self.get_cache_key(year, month, get_user_cache_version(request.user.id))
+        tasks_by_day = cache.get(cache_key)
+        if tasks_by_day is not None:
+            return APIResponse(tasks_by_day)
+
+        days, queryset, aggregates = self.get_counts_query(year, month)
+        tasks_by_day = self.group_by_day(days, queryset.aggregate(**aggregates))
+        cache.set(cache_key, tasks_by_day, CALENDAR_CACHE_TIMEOUT)
+
+        return APIResponse(tasks_by_day)
+
+    def get_month(self):
+        """``(year, month)`` from the query string; raises ValueError when invalid."""
+        try:
+            month = int(self.request.GET.get('month'))
+            year = int(self.request.GET.get('year'))
+        except TypeError:
+            raise ValueError('month and year are required')
+
         if month < 1 or month > 12 or year < 1900:
-            return APIResponse({"error": "Invalid month or year."}, status_code=400)
+            raise ValueError('month or year out of range')
+        return year, month
+
+    def get_cache_key(self, year, month, version):
+        return 'tasks_by_month:{}:{}:{}-{}'.format(self.request.user.id, version, year, month)
 
+    def get_counts_query(self, year, month):
         start_date = datetime(year, month, 1)
         end_date = datetime(year, month + 1, 1) if month != 12 else datetime(year + 1, 1, 1)
 
         start_date = timezone.make_aware(start_date, timezone.get_default_timezone())
         end_date = timezone.make_aware(end_date, timezone.get_default_timezone())
 
-        tasks_by_day = {}
-
+        # Count every day of the month with conditional aggregates so the whole
+        # calendar is computed by a single query.
+        days = []
+        aggregates = {}
         current_date = start_date
         while current_date < end_date:
             start_of_day = current_date.replace(hour=0, minute=0, second=0, microsecond=0)
             end_of_day = current_date.replace(hour=23, minute=59, second=59, microsecond=999999)
+            day = len(days)
 
-            doing_count = (Task.objects.filter(
+            aggregates[f'doing_{day}'] = Count('id', filter=Q(
                 deadline__gte=start_of_day,
                 status=1,
-                project__user=self.request.user,
-                created_at__lte=end_of_day)
-                           .count())
-            on_deadline_count = (Task.objects.filter(
+                created_at__lte=end_of_day))
+            aggregates[f'on_deadline_{day}'] = Count('id', filter=Q(
                 deadline__range=[start_of_day, end_of_day],
-                status=1,
-                project__user=self.request.user)
-                                 .count())
-            overdue_count = (Task.objects.filter(
+                status=1))
+            aggregates[f'overdue_{day}'] = Count('id', filter=Q(
                 deadline__lt=start_of_day,
-                status=3,
-                project__user=self.request.user)
-                             .count())
-
-            tasks_by_day[current_date.strftime('%Y-%m-%d')] = {
-                'doing': doing_count,
-                'on_deadline': on_deadline_count,
-                'overdue': overdue_count
-            }
+                status=3))
 
+            days.append(current_date.strftime('%Y-%m-%d'))
             current_date += timedelta(days=1)
 
-        return APIResponse(tasks_by_day)
+        queryset = Task.objects.filter(
+            Q(status=1, deadline__gte=start_date) | Q(status=3, deadline__lt=end_date),
+            user=self.request.user,
+        )
+        return days, queryset, aggregates
+
+    @staticmethod
+    def group_by_day(days, counts):
+        tasks_by_day = {}
+        for day, date in enumerate(days):
+            tasks_by_day[date] = {
+                'doing': counts[f'doing_{day}'],
+                'on_deadline': counts[f'on_deadline_{day}'],
+                'overdue': counts[f'overdue_{day}']
+            }
+        return tasks_by_day
 
 
 class TasksByDateView(generics.ListAPIView):
@@ -499,7 +621,8 @@ class TasksByDateView(generics.ListAPIView):
         })
 
     def get_queryset(self, time_filter=None):
-        return Task.objects.filter(project__user=self.request.user, deadline__gte=time_filter, status=1)
+        return Task.order_by_status_and_time().filter(user=self.request.user, deadline__gte=time_filter,
+                                                      status=1)
 
 
 class TaskCreateView(generics.CreateAPIView):
@@ -512,12 +635,19 @@ class TaskCreateView(generics.CreateAPIView):
         self.perform_create(serializer)
         return APIResponse(serializer.data)
 
+    def perform_create(self, serializer):
+        column = serializer.validated_data['column']
+        serializer.save(rank=Task.next_ranks(column.id)[0])
+
 
 class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsOwner]
 
+    def get_queryset(self):
+        return Task.objects.filter(user=self.request.user).select_related('project')
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance)
@@ -529,6 +659,7 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
 
+        moved = {}
         column_id = request.data.get("column")
         if column_id:
             try:
@@ -539,10 +670,13 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
                         instance.finish_at = timezone.now()
                 else:
                     instance.finish_at = None
+                if column.id != instance.column_id:
+                    # To the end of its new column; the old rank means nothing there.
+                    moved['rank'] = Task.next_ranks(column.id)[0]
             except TableColumn.DoesNotExist:
                 return APIResponse({'error': 'COLUMN_NOT_FOUND'}, status_code=HTTPStatus.NOT_FOUND)
 
-        self.perform_update(serializer)
+        self.perform_update(serializer, **moved)
 
         if getattr(instance, '_prefetched_objects_cache', None):
             # If 'prefetch_related' has been applied to a queryset, we need to
@@ -551,7 +685,538 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
 
         return APIResponse(serializer.data)
 
+    def perform_update(self, serializer, **kwargs):
+        serializer.save(**kwargs)
+
+    def perform_destroy(self, instance):
+        # Model.delete() names only the id, which searches every partition of tasks.
+        with transaction.atomic():
+            delete_tasks(instance.user_id, [instance.id])
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         self.perform_destroy(instance)
         return APIResponse(status_code=status.HTTP_200_OK)
+
+
+class TaskBulkView(generics.GenericAPIView):
+    max_batch_size = 1000
+
+    def get_serializer_class(self):
+        if self.request.method == 'POST':
+            return BulkCreateTaskSerializer
+        return BulkUpdateTaskSerializer
+
+    def validate_batch(self, items):
+        if not isinstance(items, list):
+            return APIResponse(
+                data={"errors": "Request data must be a list of tasks."},
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > self.max_batch_size:
+            return APIResponse(
+                data={"errors": f"A batch may contain at most {self.max_batch_size} tasks."},
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        return None
+
+    def errors_response(self, errors):
+        return APIResponse(
+            data={"errors": errors},
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+    def post(self, request, *args, **kwargs):
+        error = self.validate_batch(request.data)
+        if error:
+            return error
+
+        task_serializers = [self.get_serializer(data=task_data) for task_data in request.data]
+        errors = [{"index": index, "errors": serializer.errors}
+                  for index, serializer in enumerate(task_serializers) if not serializer.is_valid()]
+        if errors:
+            return self.errors_response(errors)
+
+        projects = Project.objects.in_bulk(
+            {serializer.validated_data['project'] for serializer in task_serializers}
+        )
+        columns = TableColumn.objects.in_bulk(
+            {serializer.validated_data['column'] for serializer in task_serializers}
+        )
+
+        now = timezone.now()
+        tasks = []
+        for index, serializer in enumerate(task_serializers):
+            data = dict(serializer.validated_data)
+            project = projects.get(data.pop('project'))
+            column = columns.get(data.pop('column'))
+
+            if project is None or project.user_id != request.user.id:
+                errors.append({"index": index, "errors": {"project": ["PROJECT_NOT_FOUND"]}})
+                continue
+            if column is None or column.project_id != project.id:
+                errors.append({"index": index, "errors": {"column": ["COLUMN_NOT_FOUND"]}})
+                continue
+
+            task = Task(project=project, column=column, user_id=project.user_id, **data)
+            if column.is_done_column:
+                if not task.finish_at:
+                    task.finish_at = now
+            else:
+                task.finish_at = None
+            tasks.append(task)
+
+        if errors:
+            return self.errors_response(errors)
+
+        tasks_by_column = defaultdict(list)
+        for task in tasks:
+            tasks_by_column[task.column_id].append(task)
+        last_ranks = dict(
+            Task.objects.filter(column_id__in=tasks_by_column).order_by()
+            .values('column_id').annotate(last=Max('rank')).values_list('column_id', 'last')
+        )
+        for column_id, column_tasks in tasks_by_column.items():
+            for task, rank in zip(column_tasks, ranks_between(last_ranks.get(column_id), None, len(column_tasks))):
+                task.rank = rank
+
+        with transaction.atomic():
+            Project.stamp_revisions(tasks)
+            Task.objects.bulk_create(tasks)
+            transaction.on_commit(lambda: bump_user_cache_version(request.user.id))
+
+        return APIResponse(data=TaskSerializer(tasks, many=True).data, status_code=status.HTTP_201_CREATED)
+
+    def patch(self, request, *args, **kwargs):
+        error = self.validate_batch(request.data)
+        if error:
+            return error
+
+        task_serializers = [self.get_serializer(data=task_data, partial=True) for task_data in request.data]
+        errors = [{"index": index, "errors": serializer.errors}
+                  for index, serializer in enumerate(task_serializers) if not serializer.is_valid()]
+        if errors:
+            return self.errors_response(errors)
+
+        with transaction.atomic():
+            tasks = Task.objects.select_for_update(of=('self',)).filter(user=request.user).in_bulk(
+                {serializer.validated_data['id'] for serializer in task_serializers}
+            )
+            columns = TableColumn.objects.in_bulk(
+                {serializer.validated_data['column'] for serializer in task_serializers
+                 if 'column' in serializer.validated_data}
+            )
+
+            now = timezone.now()
+            fields = {'updated_at'}
+            moved_by_column = defaultdict(list)
+            for index, serializer in enumerate(task_serializers):
+                data = dict(serializer.validated_data)
+                task = tasks.get(data.pop('id'))
+                if task is None:
+                    errors.append({"index": index, "errors": {"id": ["TASK_NOT_FOUND"]}})
+                    continue
+
+                if 'column' in data:
+                    column = columns.get(data.pop('column'))
+                    if column is None or column.project_id != task.project_id:
+                        errors.append({"index": index, "errors": {"column": ["COLUMN_NOT_FOUND"]}})
+                        continue
+
+                    if column.id != task.column_id:
+                        moved_by_column[column.id].append(task)
+                    task.column = column
+                    if column.is_done_column:
+                        if not task.finish_at:
+                            task.finish_at = now
+                    else:
+                        task.finish_at = None
+                    fields.update(['column', 'finish_at'])
+
+                for field, value in data.items():
+                    setattr(task, field, value)
+                fields.update(data)
+                task.updated_at = now
+
+            if errors:
+                transaction.set_rollback(True)
+                return self.errors_response(errors)
+
+            # Moved tasks go to the end of their new column, in request order.
+            last_ranks = dict(
+                Task.objects.filter(user=request.user, column_id__in=moved_by_column).order_by()
+                .values('column_id').annotate(last=Max('rank')).values_list('column_id', 'last')
+            )
+            for column_id, column_tasks in moved_by_column.items():
+                for task, rank in zip(column_tasks, ranks_between(last_ranks.get(column_id), None, len(column_tasks))):
+                    task.rank = rank
+                fields.add('rank')
+
+            Project.stamp_revisions(tasks.values())
+            Task.objects.bulk_update(tasks.values(), list(fields | {'revision'}))
+            transaction.on_commit(lambda: bump_user_cache_version(request.user.id))
+
+        return APIResponse(data=TaskSerializer(tasks.values(), many=True).data)
+
+    def delete(self, request, *args, **kwargs):
+        error = self.validate_batch(request.data)
+        if error:
+            return error
+
+        ids = []
+        errors = []
+        field = serializers.UUIDField()
+        for index, task_id in enumerate(request.data):
+            try:
+                ids.append(field.to_internal_value(task_id))
+            except serializers.ValidationError as e:
+                errors.append({"index": index, "errors": {"id": e.detail}})
+        if errors:
+            return self.errors_response(errors)
+
+        with transaction.atomic():
+            deleted = delete_tasks(request.user.id, ids)
+            errors = [{"index": index, "errors": {"id": ["TASK_NOT_FOUND"]}}
+                      for index, task_id in enumerate(ids) if task_id not in deleted]
+            if errors:
+                transaction.set_rollback(True)
+                return self.errors_response(errors)
+
+        return APIResponse(status_code=status.HTTP_200_OK)
+
+
+class ReorderView(generics.GenericAPIView):
+    serializer_class = ReorderSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return self.reorder(serializer.validated_data.get('columns', []), serializer.validated_data.get('tasks', []))
+
+    def reorder(self, column_moves, task_moves):
+        """Apply the moves in order; each moved item gets a single new rank."""
+        user = self.request.user
+        now = timezone.now()
+        column_errors = []
+        task_errors = []
+
+        with transaction.atomic():
+            # Columns of the projects whose columns move, plus the target columns of task moves.
+            referenced = TableColumn.objects.filter(project__user=user).in_bulk(
+                {move['id'] for move in column_moves} | {move['column'] for move in task_moves if 'column' in move}
+            )
+            moved_projects = {referenced[move['id']].project_id for move in column_moves if move['id'] in referenced}
+
+            # Tasks, then projects, then columns: the order every task write takes them in,
+            # since the counter triggers lock the project before updating its columns.
+            moved_tasks = Task.objects.filter(user=user).select_for_update(of=('self',)).only(
+                'id', 'rank', 'column_id', 'project_id', 'finish_at'
+            ).in_bulk({move['id'] for move in task_moves})
+            target_columns = {move.get('column') or moved_tasks[move['id']].column_id
+                              for move in task_moves if move['id'] in moved_tasks}
+            tasks = {
+                task.id: task for task in Task.objects.filter(user=user, column_id__in=target_columns)
+                .select_for_update(of=('self',)).only('id', 'rank', 'column_id', 'project_id', 'finish_at')
+            }
+            tasks.update(moved_tasks)
+
+            locked_projects = moved_projects | {task.project_id for task in moved_tasks.values()}
+            list(Project.objects.filter(id__in=locked_projects).order_by('id').select_for_update().values_list('id'))
+            columns = {
+                column.id: column
+                for column in TableColumn.objects.filter(project_id__in=moved_projects).select_for_update()
+            }
+            for column_id, column in referenced.items():
+                columns.setdefault(column_id, column)
+
+            column_scopes = defaultdict(list)
+            for column in columns.values():
+                if column.project_id in moved_projects:
+                    column_scopes[column.project_id].append(column)
+            task_scopes = defaultdict(list)
+            for task in tasks.values():
+                task_scopes[task.column_id].append(task)
+            for scope in list(column_scopes.values()) + list(task_scopes.values()):
+                scope.sort(key=lambda item: item.rank)
+
+            changed_columns = {}
+            for index, move in enumerate(column_moves):
+                column = columns.get(move['id'])
+                if column is None or move['id'] not in referenced:
+                    column_errors.append({"index": index, "errors": {"id": ["COLUMN_NOT_FOUND"]}})
+                    continue
+
+                siblings = [sibling for sibling in column_scopes[column.project_id] if sibling.id != column.id]
+                try:
+                    rank, position, rebalanced = rank_for_move(siblings, move.get('after'), move.get('before'))
+                except ValueError:
+                    column_errors.append({"index": index, "errors": {"after": ["NEIGHBOR_NOT_FOUND"]}})
+                    continue
+
+                column.rank = rank
+                siblings.insert(position, column)
+                column_scopes[column.project_id] = siblings
+                for changed in rebalanced + [column]:
+                    changed.updated_at = now
+                    changed_columns[changed.id] = changed
+
+            changed_tasks = {}
+            for index, move in enumerate(task_moves):
+                task = moved_tasks.get(move['id'])
+                if task is None:
+                    task_errors.append({"index": index, "errors": {"id": ["TASK_NOT_FOUND"]}})
+                    continue
+
+                column = columns.get(move.get('column', task.column_id))
+                if 'column' in move and (column is None or column.project_id != task.project_id):
+                    task_errors.append({"index": index, "errors": {"column": ["COLUMN_NOT_FOUND"]}})
+                    continue
+
+                siblings = [sibling for sibling in task_scopes[column.id if column else task.column_id]
+                            if sibling.id != task.id]
+                try:
+                    rank, position, rebalanced = rank_for_move(siblings, move.get('after'), move.get('before'))
+                except ValueError:
+                    task_errors.append({"index": index, "errors": {"after": ["NEIGHBOR_NOT_FOUND"]}})
+                    continue
+
+                task_scopes[task.column_id] = [sibling for sibling in task_scopes[task.column_id]
+                                               if sibling.id != task.id]
+                if 'column' in move and column.id != task.column_id:
+                    task.column_id = column.id
+                    if column.is_done_column:
+                        if not task.finish_at:
+                            task.finish_at = now
+                    else:
+                        task.finish_at = None
+                task.rank = rank
+                siblings.insert(position, task)
+                task_scopes[task.column_id] = siblings
+                for changed in rebalanced + [task]:
+                    changed.updated_at = now
+                    changed_tasks[changed.id] = changed
+
+            if column_errors or task_errors:
+                transaction.set_rollback(True)
+                return APIResponse(
+                    data={"errors": {"columns": column_errors, "tasks": task_errors}},
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+
+            Project.stamp_revisions(list(changed_columns.values()) + list(changed_tasks.values()))
+            TableColumn.objects.bulk_update(changed_columns.values(), ['rank', 'updated_at', 'revision'])
+            Task.objects.bulk_update(changed_tasks.values(), ['rank', 'column', 'finish_at', 'updated_at', 'revision'])
+            transaction.on_commit(lambda: bump_user_cache_version(user.id))
+
+            # Ranks only grow when inserting repeatedly at the same spot; respread them in the background.
+            for project_id in {column.project_id for column in changed_columns.values()
+                               if len(column.rank) > RANK_REBALANCE_LENGTH}:
+                transaction.on_commit(lambda project_id=project_id: rebalance_column_ranks.delay(str(project_id)))
+            for column_id in {task.column_id for task in changed_tasks.values()
+                              if len(task.rank) > RANK_REBALANCE_LENGTH}:
+                transaction.on_commit(lambda column_id=column_id: rebalance_task_ranks.delay(str(column_id)))
+
+        return APIResponse({
+            'columns': [{'id': column.id, 'rank': column.rank} for column in changed_columns.values()],
+            'tasks': [{'id': task.id, 'column': task.column_id, 'rank': task.rank, 'finish_at': task.finish_at}
+                      for task in changed_tasks.values()],
+        })
+
+
+class TableColumnMoveView(ReorderView):
+    serializer_class = ColumnMoveSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data={**request.data, 'id': self.kwargs['pk']})
+        serializer.is_valid(raise_exception=True)
+        return self.reorder([serializer.validated_data], [])
+
+
+class TaskMoveView(ReorderView):
+    serializer_class = TaskMoveSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data={**request.data, 'id': self.kwargs['pk']})
+        serializer.is_valid(raise_exception=True)
+        return self.reorder([], [serializer.validated_data])
+
+
+class ProjectSyncView(APIView):
+
+    def get(self, request, *args, **kwargs):
+        try:
+            project = Project.objects.select_related('user').get(id=self.kwargs['project_id'], user=request.user)
+        except Project.DoesNotExist:
+            return APIResponse({
+                'error': 'Project not found'
+            }, status_code=status.HTTP_404_NOT_FOUND)
+
+        since = request.GET.get('since')
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                return APIResponse({"error": "Invalid since revision."}, status_code=HTTPStatus.BAD_REQUEST)
+
+        # Without a cursor, or with one older than the pruned tombstones, send everything.
+        reset = since is None or since < project.pruned_revision or since > project.revision
+        columns = TableColumn.objects.filter(project=project)
+        tasks = Task.objects.filter(user_id=project.user_id, project=project)
+        deleted_columns = []
+        deleted_tasks = []
+        if not reset:
+            columns = columns.filter(revision__gt=since)
+            tasks = tasks.filter(revision__gt=since)
+            for model, object_id in (Tombstone.objects.filter(project=project, revision__gt=since)
+                                     .values_list('model', 'object_id')):
+                if model == Tombstone.COLUMN:
+                    deleted_columns.append(object_id)
+                else:
+                    deleted_tasks.append(object_id)
+
+        return APIResponse({
+            'revision': project.revision,
+            'reset': reset,
+            'project': ProjectSerializer(project).data,
+            'columns': SyncTableColumnSerializer(columns, many=True).data,
+            'tasks': SyncTaskSerializer(tasks, many=True).data,
+            'deleted': {
+                'columns': deleted_columns,
+                'tasks': deleted_tasks,
+            },
+        })
+
+
+class SearchTaskListView(generics.ListAPIView):
+    serializer_class = SearchTaskSerializer
+    pagination_class = SearchPagination
+
+    def list(self, request, *args, **kwargs):
+        query = request.GET.get('q', '').strip()
+        if not query:
+            return APIResponse({"error": "Missing search query 'q'."}, status_code=HTTPStatus.BAD_REQUEST)
+
+        queryset = self.filter_queryset(self.get_queryset(query))
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return PaginationAPIResponse({
+            'total_tasks': len(serializer.data),
+            'tasks': serializer.data,
+        }, pagination=self.paginator.get_pagination())
+
+    def get_queryset(self, query=None):
+        # Archived tasks are found too, flagged with ``archived``.
+        return Task.search(query, TaskWithArchive.objects.all()).filter(user=self.request.user).annotate(
+            project_name=F('project__name')
+        )
+
+
+class ArchivedTaskListView(generics.ListAPIView):
+    serializer_class = ArchivedTaskSerializer
+    pagination_class = Pagination
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return PaginationAPIResponse(serializer.data, pagination=self.paginator.get_pagination())
+
+    def get_queryset(self):
+        queryset = ArchivedTask.objects.filter(user=self.request.user, project__deleted_at__isnull=True)
+        project_id = self.request.GET.get('project')
+        if project_id:
+            try:
+                queryset = queryset.filter(project_id=UUID(project_id))
+            except ValueError:
+                raise serializers.ValidationError({'project': 'Must be a valid UUID.'})
+        return queryset.order_by('-finish_at', 'id')
+
+
+class RestoreArchivedTaskView(APIView):
+    def post(self, request, pk):
+        task = restore_task(pk, request.user)
+        if task is None:
+            return APIResponse({'error': 'TASK_NOT_FOUND'}, status_code=HTTPStatus.NOT_FOUND)
+        return APIResponse(TaskSerializer(task).data)
+
+
+class Echo:
+    """File-like object that hands back what is written, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+class ExportView(APIView):
+    # Accept whatever the client asks for; the body is streamed, not rendered.
+    renderer_classes = [ORJSONRenderer, PassthroughRenderer]
+    chunk_size = 2000
+    project_fields = ['id', 'name', 'created_at', 'updated_at']
+    column_fields = ['id', 'project_id', 'name', 'order', 'rank', 'is_done_column', 'created_at', 'updated_at']
+    task_fields = ['id', 'project_id', 'column_id', 'title', 'content', 'deadline', 'priority', 'status', 'finish_at',
+                   'rank', 'created_at', 'updated_at']
+    csv_header = ['type', 'id', 'project_id', 'column_id', 'name', 'order', 'rank', 'is_done_column', 'content',
+                  'deadline', 'priority', 'status', 'finish_at', 'created_at', 'updated_at']
+
+    def get(self, request, *args, **kwargs):
+        export_type = request.GET.get('type', 'ndjson')
+        if export_type == 'ndjson':
+            response = StreamingHttpResponse(self.stream_ndjson(), content_type='application/x-ndjson')
+        elif export_type == 'csv':
+            response = StreamingHttpResponse(self.stream_csv(), content_type='text/csv')
+        else:
+            return APIResponse({"error": "Invalid export type, use 'ndjson' or 'csv'."},
+                               status_code=HTTPStatus.BAD_REQUEST)
+
+        response['Content-Disposition'] = f'attachment; filename="tasks.{export_type}"'
+        return response
+
+    def iter_rows(self):
+        """Yield (type, row) for every project, column and task, read by server-side cursors."""
+        user = self.request.user
+        querysets = [
+            ('project', Project.objects.filter(user=user).order_by('id').values(*self.project_fields)),
+            ('column', TableColumn.objects.filter(project__user=user).order_by('project_id', 'rank', 'order')
+             .values(*self.column_fields)),
+            ('task', Task.objects.filter(user=user).order_by('project_id', 'column_id', 'rank')
+             .values(*self.task_fields)),
+        ]
+        for row_type, queryset in querysets:
+            for row in queryset.iterator(chunk_size=self.chunk_size):
+                yield row_type, row
+
+    def stream_ndjson(self):
+        for row_type, row in self.iter_rows():
+            yield orjson.dumps({'type': row_type, **row}, default=default, option=orjson.OPT_UTC_Z) + b'\n'
+
+    def stream_csv(self):
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.csv_header)
+        for row_type, row in self.iter_rows():
+            row = dict(row, type=row_type)
+            row.setdefault('name', row.get('title'))
+            yield writer.writerow([
+                default(value) if isinstance(value, (datetime, UUID)) else value
+                for value in (row.get(field) for field in self.csv_header)
+            ])
+
+
+class ImportView(APIView):
+    def post(self, request, *args, **kwargs):
+        import_type = request.GET.get('type', 'ndjson')
+        upload = request.FILES.get('file')
+        if upload is None:
+            return APIResponse(data={"errors": "Upload the file to import as 'file'."},
+                               status_code=status.HTTP_400_BAD_REQUEST)
+        try:
+            importer = TaskImporter(request.user, import_type)
+        except ValueError as e:
+            return APIResponse(data={"errors": str(e)}, status_code=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            counts = importer.run(open_text(upload.file))
+        except TaskImportError as e:
+            return APIResponse(data={"errors": e.errors}, status_code=status.HTTP_400_BAD_REQUEST)
+        return APIResponse({"projects": counts['project'], "columns": counts['column'], "tasks": counts['task']})